@@ -7,7 +7,7 @@ This package contains various agents for fact-checking and claim analysis:
 - Sage Agent: Provides additional analysis and context
 """
 
-from .agent_clarity import run_clarity_agent
-from .agent_proof import run_proof_agent
+from .agent_clarity import run_clarity_agent, run_clarity_agent_batch, stream_clarity_agent_batch
+from .agent_proof import run_proof_agent, stream_proof_agent, close_session
 
-__all__ = ['run_clarity_agent', 'run_proof_agent'] 
\ No newline at end of file
+__all__ = ['run_clarity_agent', 'run_clarity_agent_batch', 'stream_clarity_agent_batch', 'run_proof_agent', 'stream_proof_agent', 'close_session'] 
\ No newline at end of file
@@ -0,0 +1,9 @@
+"""Process-wide setup shared by the agents; runs once, on first import."""
+import logging
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Configure logging (a no-op if the host application already configured it)
+logging.basicConfig(level=logging.INFO)
@@ -1,31 +1,22 @@
 import os
+import ijson
 import google.generativeai as genai
 import logging
+from typing import AsyncIterator, List
 from datetime import datetime
+from . import _bootstrap  # noqa: F401
+from .parsing import parse_json_response
+from .rate_limit import gemini_limiter
+from .gemini import get_model
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-async def run_clarity_agent(claim: str) -> dict:
-    """
-    Analyze a claim for clarity and structure using Gemini.
-    
-    Args:
-        claim (str): The claim to analyze
-        
-    Returns:
-        dict: Analysis results including clarity score and components
-    """
-    try:
-        # Initialize Gemini
-        model = genai.GenerativeModel('models/gemini-1.5-flash-latest')
-        
-        # Create prompt
-        prompt = f"""
+# Prompt templates, built once at import. They use %-substitution so the
+# JSON braces in the examples need no escaping.
+_CLARITY_PROMPT_TEMPLATE = """
         Analyze the following claim for clarity and structure:
         
-        Claim: {claim}
+        Claim: %s
         
         Please provide:
         1. A clarity score (0-1)
@@ -33,60 +24,204 @@ async def run_clarity_agent(claim: str) -> dict:
         3. Suggestions for improvement if needed
         
         Format the response as a JSON object with the following structure:
-        {{
+        {
             "clarity_score": float,
             "components": [
-                {{
+                {
                     "type": str,
                     "text": str
-                }}
+                }
             ],
             "suggestions": [str],
             "original_claim": str
-        }}
+        }
         """
+
+_CLARITY_BATCH_PROMPT_TEMPLATE = """
+        Analyze each of the following claims for clarity and structure.
+        The claims are delimited by '---' and numbered from 0.
         
-        # Get response from Gemini
-        response = await model.generate_content_async(prompt)
-        result = response.text
+        %s
         
-        # Parse the response
-        try:
-            analysis = eval(result)  # Simple parsing for now
-            analysis['timestamp'] = datetime.now().isoformat()
-            return analysis
-        except Exception as e:
-            logger.error(f"Error parsing Gemini response: {str(e)}")
-            return {
-                "clarity_score": 0.5,
-                "components": [{"type": "error", "text": "Error parsing response"}],
-                "suggestions": ["Please try again"],
-                "original_claim": claim,
-                "timestamp": datetime.now().isoformat()
-            }
-            
-    except Exception as e:
-        logger.error(f"Error in clarity agent: {str(e)}")
-        return {
-            "clarity_score": 0.5,
-            "components": [{"type": "error", "text": str(e)}],
-            "suggestions": ["Please try again"],
-            "original_claim": claim,
-            "timestamp": datetime.now().isoformat()
+        For each claim, provide:
+        1. A clarity score (0-1)
+        2. Breakdown of claim components (subject, predicate, qualifiers, etc.)
+        3. Suggestions for improvement if needed
+        
+        Format the response as a JSON array with exactly one object per claim,
+        in input order, each with the following structure:
+        {
+            "clarity_score": float,
+            "components": [
+                {
+                    "type": str,
+                    "text": str
+                }
+            ],
+            "suggestions": [str],
+            "original_claim": str
         }
+        """
+
+def _fallback_result(claim: str, message: str) -> dict:
+    """Build the neutral result returned when clarity analysis fails."""
+    return {
+        "clarity_score": 0.5,
+        "components": [{"type": "error", "text": message}],
+        "suggestions": ["Please try again"],
+        "original_claim": claim,
+        "timestamp": datetime.now().isoformat()
+    }
+
+def _parse_analysis(text: str, claim: str) -> dict:
+    """Parse a single clarity analysis, falling back to a neutral result."""
+    try:
+        analysis = parse_json_response(text)
+    except Exception as e:
+        logger.error("Error parsing Gemini response: %s", e)
+        return _fallback_result(claim, "Error parsing response")
+    if not isinstance(analysis, dict):
+        logger.error("Error parsing Gemini response: expected a JSON object")
+        return _fallback_result(claim, "Error parsing response")
+    analysis['timestamp'] = datetime.now().isoformat()
+    return analysis
+
+def _batch_item(analysis, claim: str, timestamp: str) -> dict:
+    """Validate one entry of a batch response, falling back if it is missing or malformed."""
+    if not isinstance(analysis, dict):
+        return _fallback_result(claim, "Missing analysis in batch response")
+    analysis['timestamp'] = timestamp
+    return analysis
+
+def _parse_batch_analyses(text: str, claims: List[str]) -> List[dict]:
+    """Parse a batch clarity response into one analysis per claim, in input order."""
+    try:
+        analyses = parse_json_response(text)
+    except Exception as e:
+        logger.error("Error parsing Gemini batch response: %s", e)
+        analyses = None
+    if not isinstance(analyses, list):
+        return [_fallback_result(claim, "Error parsing response") for claim in claims]
+    
+    timestamp = datetime.now().isoformat()
+    results = [
+        _batch_item(analyses[i] if i < len(analyses) else None, claim, timestamp)
+        for i, claim in enumerate(claims)
+    ]
+    logger.debug("Cleaned clarity analyses for %d claims", len(results))
+    return results
+
+async def run_clarity_agent(claim: str) -> dict:
+    """
+    Analyze a claim for clarity and structure using Gemini.
+    
+    Args:
+        claim (str): The claim to analyze
+        
+    Returns:
+        dict: Analysis results including clarity score and components
+    """
+    try:
+        async with gemini_limiter:
+            response = await get_model().generate_content_async(_CLARITY_PROMPT_TEMPLATE % claim)
+        text = response.text
+    except Exception as e:
+        logger.error("Error in clarity agent: %s", e)
+        return _fallback_result(claim, str(e))
+    return _parse_analysis(text, claim)
+
+async def run_clarity_agent_batch(claims: List[str]) -> List[dict]:
+    """
+    Analyze several claims for clarity and structure in a single Gemini call.
+    
+    Args:
+        claims (List[str]): The claims to analyze
+        
+    Returns:
+        List[dict]: One analysis result per claim, in input order
+    """
+    if not claims:
+        return []
+    
+    inputs = "---\n".join(
+        f"INPUT {i}: {claim.strip()}\n" for i, claim in enumerate(claims)
+    )
+    try:
+        async with gemini_limiter:
+            response = await get_model().generate_content_async(_CLARITY_BATCH_PROMPT_TEMPLATE % inputs)
+        text = response.text
+    except Exception as e:
+        logger.error("Error in clarity agent batch: %s", e)
+        return [_fallback_result(claim, str(e)) for claim in claims]
+    return _parse_batch_analyses(text, claims)
+
+async def stream_clarity_agent_batch(claims: List[str]) -> AsyncIterator[dict]:
+    """
+    Analyze several claims in a single streamed Gemini call, yielding each
+    analysis as soon as its JSON object has been generated.
+    
+    Args:
+        claims (List[str]): The claims to analyze
+        
+    Yields:
+        dict: One analysis result per claim, in input order
+    """
+    if not claims:
+        return
+    
+    inputs = "---\n".join(
+        f"INPUT {i}: {claim.strip()}\n" for i, claim in enumerate(claims)
+    )
+    emitted = 0
+    try:
+        # Hold the limiter until the stream has been consumed; the request
+        # is still in flight while its chunks arrive
+        async with gemini_limiter:
+            response = await get_model().generate_content_async(
+                _CLARITY_BATCH_PROMPT_TEMPLATE % inputs, stream=True
+            )
+            parsed = ijson.sendable_list()
+            parser = ijson.items_coro(parsed, "item", use_float=True)
+            started = False
+            async for chunk in response:
+                text = chunk.text
+                if not started:
+                    # Skip any markdown fence before the JSON array
+                    start = text.find("[")
+                    if start == -1:
+                        continue
+                    text = text[start:]
+                    started = True
+                parser.send(text.encode())
+                for analysis in parsed:
+                    if emitted < len(claims):
+                        yield _batch_item(analysis, claims[emitted], datetime.now().isoformat())
+                        emitted += 1
+                del parsed[:]
+                if emitted >= len(claims):
+                    break
+            else:
+                # Flush the parser so a truncated array is reported
+                parser.close()
+    except Exception as e:
+        logger.error("Error in streamed clarity agent batch: %s", e)
+    
+    for claim in claims[emitted:]:
+        yield _fallback_result(claim, "Missing analysis in batch response")
 
 # For testing
 if __name__ == "__main__":
-    test_text = "Is the earth flat?"
-    
-    # Initialize model
-    import os
-    from dotenv import load_dotenv
-    load_dotenv()
+    import asyncio
+    # Use uvloop's faster event loop when it is installed
+    try:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ImportError:
+        pass
     
+    test_text = "Is the earth flat?"
     genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
-    model = genai.GenerativeModel('models/gemini-1.5-flash-latest')
     
     # Run test
-    result = run_clarity_agent(test_text)
+    result = asyncio.run(run_clarity_agent(test_text))
     print(result)
\ No newline at end of file
@@ -1,19 +1,32 @@
 import os
-import json
+import re
+import orjson
+import atexit
+import time
+import hashlib
+import functools
 import logging
-from typing import Dict, List, Optional, Tuple, Any
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, Dict, List, Optional, Tuple, Any
 import aiohttp
 import asyncio
+import ijson
+import numpy as np
+from cachetools import TTLCache
 from datetime import datetime
-from dotenv import load_dotenv
+from urllib.parse import urlparse
 import google.generativeai as genai
+from . import _bootstrap  # noqa: F401
 from .agent_sage import run_sage_agent
+from .parsing import parse_json_response
+from .rate_limit import serper_limiter, gemini_limiter
+from .gemini import get_model, configure_from_env
 
-# Load environment variables
-load_dotenv()
+try:
+    import diskcache
+except ImportError:  # Persistent caching is optional
+    diskcache = None
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Define reliable sources and conspiracy keywords
@@ -44,7 +57,6 @@ RELIABLE_SOURCES = {
     # Educational and Reference
     "smithsonianmag.com": 0.9,
     "nationalgeographic.com": 0.9,
-    "britannica.com": 0.95,
     "history.com": 0.85,
     "worldbank.org": 0.9,
     "un.org": 0.9,
@@ -95,63 +107,238 @@ COMMON_KNOWLEDGE = {
     "earth orbits sun": 0.95
 }
 
+def _compile_keyword_pattern(keywords) -> "re.Pattern":
+    """Compile keywords into a single alternation that reports every match.
+    
+    The lookahead makes each match zero-width, so overlapping keywords are all
+    found in one left-to-right pass; longer keywords are tried first. Keywords
+    only match whole words, so "gravity exists" doesn't match "antigravity exists".
+    """
+    alternation = "|".join(re.escape(k) for k in sorted(keywords, key=len, reverse=True))
+    return re.compile(rf"(?=\b({alternation})\b)")
+
+_CONSPIRACY_PATTERN = _compile_keyword_pattern(CONSPIRACY_KEYWORDS)
+_COMMON_KNOWLEDGE_PATTERN = _compile_keyword_pattern(COMMON_KNOWLEDGE)
+
+# Heuristic scores decisive enough to skip the Serper and Gemini round-trips
+HEURISTIC_COMMON_THRESHOLD = 0.9
+HEURISTIC_CONSPIRACY_THRESHOLD = 0.8
+
+# Counts of claims checked and decided by the local heuristics
+_heuristic_stats = {"checked": 0, "hits": 0}
+
+# Keywords indicating support or contradiction in evidence snippets
+SUPPORT_KEYWORDS = frozenset({"confirm", "verify", "prove", "evidence shows", "research shows", "study shows", "scientists agree"})
+CONTRADICTION_KEYWORDS = frozenset({"debunk", "false", "myth", "hoax", "conspiracy", "disprove", "refute"})
+
+# Only presence matters for these, so a plain alternation is enough. Keywords
+# match as prefixes and phrases ("confirmed", "evidence shows"), so they are
+# searched for rather than intersected with the snippet's word set.
+_SUPPORT_PATTERN = re.compile("|".join(map(re.escape, sorted(SUPPORT_KEYWORDS))))
+_CONTRADICTION_PATTERN = re.compile("|".join(map(re.escape, sorted(CONTRADICTION_KEYWORDS))))
+
+# Claims that negate or dispute a keyword ("vaccines cause autism is a debunked
+# myth") say the opposite of it, so the heuristics leave them to the full check
+_NEGATION_PATTERN = re.compile(
+    r"n't\b|\b(?:not|no|never)\b|\b(?:" + "|".join(map(re.escape, sorted(CONTRADICTION_KEYWORDS))) + ")"
+)
+
+# Serper search settings
+SERPER_URL = "https://google.serper.dev/search"
+SERPER_NUM_RESULTS = 5  # Organic results requested and parsed per claim
+SERPER_TIMEOUT = aiohttp.ClientTimeout(total=5)
+SERPER_BASE_PAYLOAD = {"gl": "us", "hl": "en", "num": SERPER_NUM_RESULTS}
+SERPER_BREAKER_THRESHOLD = 5  # Consecutive failures before the breaker opens
+SERPER_BREAKER_COOLDOWN = 30  # Seconds to skip Serper once the breaker is open
+
+# Circuit breaker state for the Serper API
+_serper_breaker = {"fails": 0, "open_until": 0.0}
+
+def _record_serper_failure() -> None:
+    """Count a failed Serper call and open the breaker after repeated failures."""
+    _serper_breaker["fails"] += 1
+    if _serper_breaker["fails"] >= SERPER_BREAKER_THRESHOLD:
+        _serper_breaker["open_until"] = time.monotonic() + SERPER_BREAKER_COOLDOWN
+        logger.warning("Serper circuit breaker open for %ss", SERPER_BREAKER_COOLDOWN)
+
+# Cache of Serper evidence keyed by normalized claim hash
+_evidence_cache: TTLCache = TTLCache(maxsize=2048, ttl=3600)
+
+def _claim_key(claim: str) -> str:
+    """Hash a claim after normalizing case and surrounding whitespace."""
+    return hashlib.blake2b(claim.strip().lower().encode(), digest_size=16).hexdigest()
+
+# Verdict and on-disk cache settings
+VERDICT_CACHE_TTL = 7 * 24 * 3600  # Seconds a confident verdict is reused
+EVIDENCE_DISK_TTL = 24 * 3600  # Seconds Serper evidence is kept on disk
+VERDICT_CACHE_MIN_CONFIDENCE = 0.5  # Lower-confidence verdicts are never cached
+DISK_CACHE_DIR = os.path.expanduser("~/.realitypatch/cache")
+
+# Attach a Sage context analysis to each verdict. Off by default: it costs one
+# extra Gemini call per claim, under the same rate limits as the verdicts.
+PROOF_SAGE_ANALYSIS = os.getenv("PROOF_SAGE_ANALYSIS", "").lower() in ("1", "true", "yes")
+
+# Cache of final verdicts keyed by normalized claim hash
+_verdict_cache: TTLCache = TTLCache(maxsize=1024, ttl=VERDICT_CACHE_TTL)
+
+# Persistent cache shared across runs; None until opened, False if unavailable
+_disk_cache = None
+
+def _get_disk_cache():
+    """Return the persistent cache, or None if diskcache is unavailable."""
+    global _disk_cache
+    if _disk_cache is None:
+        _disk_cache = False
+        if diskcache is not None:
+            try:
+                _disk_cache = diskcache.Cache(DISK_CACHE_DIR)
+            except Exception as e:
+                logger.warning("Disk cache unavailable: %s", e)
+    return _disk_cache if _disk_cache is not False else None
+
+def _disk_get(key: str) -> Any:
+    """Read a JSON value from the persistent cache, or None on a miss."""
+    cache = _get_disk_cache()
+    if cache is None:
+        return None
+    try:
+        data = cache.get(key)
+        return orjson.loads(data) if data is not None else None
+    except Exception as e:
+        logger.warning("Error reading disk cache: %s", e)
+        return None
+
+def _disk_set(key: str, value: Any, ttl: float) -> None:
+    """Write a JSON value to the persistent cache, ignoring failures."""
+    cache = _get_disk_cache()
+    if cache is None:
+        return
+    try:
+        cache.set(key, orjson.dumps(value), expire=ttl)
+    except Exception as e:
+        logger.warning("Error writing disk cache: %s", e)
+
+# Shared HTTP session, reused across calls so connections stay warm
+HTTP_TIMEOUT = aiohttp.ClientTimeout(total=30)  # Default for requests without their own timeout
+_session: Optional[aiohttp.ClientSession] = None
+_session_loop: Optional[asyncio.AbstractEventLoop] = None
+
+async def _get_session() -> aiohttp.ClientSession:
+    """Return the shared aiohttp session, creating it on first use.
+    
+    A session is bound to the event loop it was created on, so a new one is
+    built if the caller is running on a different loop (e.g. repeated asyncio.run).
+    """
+    global _session, _session_loop
+    loop = asyncio.get_running_loop()
+    if _session is None or _session.closed or _session_loop is not loop:
+        connector = aiohttp.TCPConnector(
+            limit=100,
+            limit_per_host=20,
+            ttl_dns_cache=300,
+            keepalive_timeout=60
+        )
+        _session = aiohttp.ClientSession(connector=connector, timeout=HTTP_TIMEOUT)
+        _session_loop = loop
+    return _session
+
+async def close_session() -> None:
+    """Close the shared aiohttp session, if one is open."""
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+
+@atexit.register
+def _close_session_at_exit() -> None:
+    """Best-effort cleanup of the shared session on interpreter shutdown."""
+    if _session is None or _session.closed or _session_loop is None:
+        return
+    if _session_loop.is_closed() or _session_loop.is_running():
+        return
+    _session_loop.run_until_complete(close_session())
+
+async def warm_up() -> None:
+    """Open a pooled connection to Serper ahead of the first search, so it
+    skips the DNS lookup and TLS handshake."""
+    try:
+        session = await _get_session()
+        async with session.head(SERPER_URL, timeout=aiohttp.ClientTimeout(total=5)):
+            pass
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        logger.warning("Serper warm-up failed: %s", e)
+
 def get_source_reliability(url: str) -> float:
     """Calculate source reliability score based on domain"""
-    for domain, score in RELIABLE_SOURCES.items():
-        if domain in url.lower():
+    try:
+        host = urlparse(url).hostname or ""
+    except ValueError:
+        host = ""
+    # Walk parent domains so www.bbc.com and news.bbc.com match bbc.com
+    while "." in host:
+        score = RELIABLE_SOURCES.get(host)
+        if score is not None:
             return score
+        host = host.split(".", 1)[1]
     return 0.5  # Default score for unknown sources
 
-def check_conspiracy_keywords(claim: str) -> float:
-    """Check for conspiracy keywords and return confidence penalty"""
-    claim_lower = claim.lower()
-    max_penalty = 0.0
-    for keyword, penalty in CONSPIRACY_KEYWORDS.items():
-        if keyword in claim_lower:
-            max_penalty = min(max_penalty, penalty)  # Take the most negative penalty
-    return max_penalty
-
-def check_common_knowledge(claim: str) -> float:
-    """Check if claim is common knowledge and return confidence boost"""
+def check_conspiracy_keywords(claim_lower: str) -> float:
+    """Check an already-lowercased claim for conspiracy keywords and return confidence penalty"""
+    # Take the most negative penalty among all matched keywords
+    penalties = (CONSPIRACY_KEYWORDS[m.group(1)] for m in _CONSPIRACY_PATTERN.finditer(claim_lower))
+    return min(0.0, min(penalties, default=0.0))
+
+def check_common_knowledge(claim_lower: str) -> float:
+    """Check if an already-lowercased claim is common knowledge and return confidence boost"""
+    match = _COMMON_KNOWLEDGE_PATTERN.search(claim_lower)
+    return COMMON_KNOWLEDGE[match.group(1)] if match else 0.0
+
+def _heuristic_verdict(claim: str) -> Optional[dict]:
+    """Return a verdict from the local keyword tables if they are decisive, else None."""
     claim_lower = claim.lower()
-    for phrase, score in COMMON_KNOWLEDGE.items():
-        if phrase in claim_lower:
-            return score
-    return 0.0
+    _heuristic_stats["checked"] += 1
+    if _NEGATION_PATTERN.search(claim_lower):
+        return None
+    common = check_common_knowledge(claim_lower)
+    conspiracy = check_conspiracy_keywords(claim_lower)
+    
+    if abs(common) >= HEURISTIC_COMMON_THRESHOLD and not conspiracy:
+        verdict, confidence = "VERIFIED", abs(common)
+        explanation = "Matches a well-established fact; decided by local heuristics without a web search."
+    elif abs(conspiracy) >= HEURISTIC_CONSPIRACY_THRESHOLD and not common:
+        verdict, confidence = "UNVERIFIED", round(1.0 - abs(conspiracy), 2)
+        explanation = "Matches a widely debunked conspiracy theory; decided by local heuristics without a web search."
+    else:
+        return None
+    
+    _heuristic_stats["hits"] += 1
+    logger.debug("Heuristic verdict hit rate: %d/%d", _heuristic_stats["hits"], _heuristic_stats["checked"])
+    return {
+        "verdict": verdict,
+        "confidence": confidence,
+        "explanation": explanation,
+        "evidence": [],
+        "timestamp": datetime.now().isoformat()
+    }
 
 def analyze_evidence_quality(evidence: List[Dict]) -> Tuple[float, float]:
     """Analyze evidence quality and return (support_score, contradiction_score)"""
     if not evidence:
         return 0.0, 0.0
     
-    support_score = 0.0
-    contradiction_score = 0.0
-    
-    # Keywords indicating support or contradiction
-    support_keywords = ["confirm", "verify", "prove", "evidence shows", "research shows", "study shows", "scientists agree"]
-    contradiction_keywords = ["debunk", "false", "myth", "hoax", "conspiracy", "disprove", "refute"]
-    
-    for e in evidence:
-        snippet = e.get("snippet", "").lower()
-        source_score = e.get("reliability", 0.5)
-        
-        # Check for support
-        for keyword in support_keywords:
-            if keyword in snippet:
-                support_score += source_score
-                break
-        
-        # Check for contradiction
-        for keyword in contradiction_keywords:
-            if keyword in snippet:
-                contradiction_score += source_score
-                break
-    
-    # Normalize scores
+    # Lowercase each snippet once and reuse it for both keyword passes
+    snippets = [e.get("snippet", "").lower() for e in evidence]
     total_evidence = len(evidence)
-    if total_evidence > 0:
-        support_score = min(1.0, support_score / total_evidence)
-        contradiction_score = min(1.0, contradiction_score / total_evidence)
+    reliabilities = np.fromiter((e.get("reliability", 0.5) for e in evidence),
+                                dtype=float, count=total_evidence)
+    support_mask = np.fromiter((_SUPPORT_PATTERN.search(s) is not None for s in snippets),
+                               dtype=bool, count=total_evidence)
+    contradiction_mask = np.fromiter((_CONTRADICTION_PATTERN.search(s) is not None for s in snippets),
+                                     dtype=bool, count=total_evidence)
+    
+    # Each snippet adds its source reliability once per category it signals
+    support_score = min(1.0, float(reliabilities @ support_mask) / total_evidence)
+    contradiction_score = min(1.0, float(reliabilities @ contradiction_mask) / total_evidence)
     
     return support_score, contradiction_score
 
@@ -169,6 +356,101 @@ def calculate_verdict(confidence: float, support_score: float, contradiction_sco
     else:
         return "Unverifiable"
 
+@functools.lru_cache(maxsize=8)
+def _serper_headers(api_key: str) -> Dict[str, str]:
+    """Build the Serper request headers once per API key."""
+    return {
+        "X-API-KEY": api_key,
+        "Content-Type": "application/json"
+    }
+
+async def _search_one(session: aiohttp.ClientSession, claim: str,
+                      headers: Dict[str, str]) -> List[Dict[str, Any]]:
+    """Run a single Serper query within the shared Serper rate limits."""
+    key = _claim_key(claim)
+    cached = _evidence_cache.get(key)
+    if cached is None:
+        cached = _disk_get(f"evidence:{key}")
+        if cached is not None:
+            _evidence_cache[key] = cached
+    if cached is not None:
+        return cached
+    
+    payload = orjson.dumps({**SERPER_BASE_PAYLOAD, "q": claim})
+    
+    if time.monotonic() < _serper_breaker["open_until"]:
+        logger.debug("Serper circuit breaker open, skipping search")
+        return []
+    
+    evidence = []
+    try:
+        async with serper_limiter:
+            async with session.post(SERPER_URL, headers=headers, data=payload,
+                                    timeout=SERPER_TIMEOUT) as response:
+                response.raise_for_status()
+                # Stream organic results off the socket, stopping once we have
+                # enough (the knowledge graph, ads and related searches are never built)
+                async for result in ijson.items_async(response.content, "organic.item", use_float=True):
+                    evidence.append({
+                        "title": result.get("title", ""),
+                        "snippet": result.get("snippet", ""),
+                        "source": result.get("link", ""),
+                        "position": result.get("position", 0)
+                    })
+                    if len(evidence) >= SERPER_NUM_RESULTS:
+                        break
+                # Drain the unparsed rest of the body so the connection goes
+                # back to the pool instead of being closed
+                await response.content.read()
+    except aiohttp.ClientResponseError as e:
+        logger.error("Serper API error: %s", e.status)
+        _record_serper_failure()
+        return []
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        logger.error("Error searching evidence: %s", e)
+        _record_serper_failure()
+        return []
+    except ijson.JSONError as e:
+        logger.error("Error parsing Serper response: %s", e)
+        _record_serper_failure()
+        return []
+    _serper_breaker["fails"] = 0
+    
+    _evidence_cache[key] = evidence
+    _disk_set(f"evidence:{key}", evidence, EVIDENCE_DISK_TTL)
+    return evidence
+
+async def search_evidence_batch(claims: List[str], api_key: str) -> List[List[Dict[str, Any]]]:
+    """
+    Search for evidence for several claims concurrently using Serper API.
+    
+    Args:
+        claims (List[str]): The claims to search for
+        api_key (str): Serper API key
+        
+    Returns:
+        List[List[Dict[str, Any]]]: Evidence items for each claim, in input order
+    """
+    headers = _serper_headers(api_key)
+    try:
+        session = await _get_session()
+        results = await asyncio.gather(
+            *(_search_one(session, claim, headers) for claim in claims),
+            return_exceptions=True
+        )
+    except Exception as e:
+        logger.error("Error searching evidence: %s", e)
+        return [[] for _ in claims]
+    
+    evidence_lists = []
+    for result in results:
+        if isinstance(result, Exception):
+            logger.error("Error searching evidence: %s", result)
+            evidence_lists.append([])
+        else:
+            evidence_lists.append(result)
+    return evidence_lists
+
 async def search_evidence(claim: str, api_key: str) -> List[Dict[str, Any]]:
     """
     Search for evidence using Serper API.
@@ -180,53 +462,15 @@ async def search_evidence(claim: str, api_key: str) -> List[Dict[str, Any]]:
     Returns:
         List[Dict[str, Any]]: List of evidence items
     """
-    try:
-        url = "https://google.serper.dev/search"
-        headers = {
-            "X-API-KEY": api_key,
-            "Content-Type": "application/json"
-        }
-        payload = {
-            "q": claim,
-            "gl": "us",
-            "hl": "en",
-            "num": 5
-        }
-        
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, headers=headers, json=payload) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    evidence = []
-                    
-                    # Extract organic results
-                    if "organic" in data:
-                        for result in data["organic"]:
-                            evidence.append({
-                                "title": result.get("title", ""),
-                                "snippet": result.get("snippet", ""),
-                                "source": result.get("link", ""),
-                                "position": result.get("position", 0)
-                            })
-                    
-                    return evidence
-                else:
-                    logger.error(f"Serper API error: {response.status}")
-                    return []
-                    
-    except Exception as e:
-        logger.error(f"Error searching evidence: {str(e)}")
-        return []
+    results = await search_evidence_batch([claim], api_key)
+    return results[0]
 
 async def analyze_with_gemini(claim: str, evidence: List[Dict]) -> Dict:
     """Analyze claim using Gemini API as fallback"""
     try:
-        api_key = os.getenv("GEMINI_API_KEY")
-        if not api_key:
+        if not configure_from_env():
             return None
-        
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel('models/gemini-1.5-flash-latest')
+        model = get_model()
         
         # Prepare evidence context
         evidence_text = "\n".join([
@@ -251,109 +495,313 @@ async def analyze_with_gemini(claim: str, evidence: List[Dict]) -> Dict:
         }}
         """
         
-        response = await model.generate_content(prompt)
-        result = json.loads(response.text)
+        async with gemini_limiter:
+            response = await model.generate_content(prompt)
+        result = parse_json_response(response.text)
         return result
     except Exception as e:
-        logger.error(f"Error with Gemini API: {str(e)}")
+        logger.error("Error with Gemini API: %s", e)
         return None
 
-async def run_proof_agent(claim: str, serper_api_key: str) -> dict:
-    """
-    Verify a claim using evidence and Gemini.
-    
-    Args:
-        claim (str): The claim to verify
-        serper_api_key (str): Serper API key for evidence search
-        
-    Returns:
-        dict: Verification results including confidence and evidence
-    """
-    try:
-        # Initialize Gemini
-        model = genai.GenerativeModel('models/gemini-1.5-flash-latest')
-        
-        # Search for evidence
-        evidence = await search_evidence(claim, serper_api_key)
-        
-        # Create prompt with evidence
-        evidence_text = "\n".join([
-            f"Source {i+1}: {e['title']}\n{e['snippet']}\nURL: {e['source']}\n"
-            for i, e in enumerate(evidence)
-        ])
+_PROOF_BATCH_PROMPT_TEMPLATE = """
+        Verify each of the following claims using the evidence provided for it.
+        The claims are delimited by '---' and numbered from 0.
         
-        prompt = f"""
-        Verify the following claim using the provided evidence:
-        
-        Claim: {claim}
-        
-        Evidence:
-        {evidence_text}
+        %s
         
-        Please provide:
+        For each claim, provide:
         1. A verdict (VERIFIED, PARTIALLY_VERIFIED, or UNVERIFIED)
         2. A confidence score (0-1)
         3. A detailed explanation
         4. Key evidence points
         
-        Format the response as a JSON object with the following structure:
-        {{
+        Format the response as a JSON array with exactly one object per claim,
+        in input order, each with the following structure:
+        {
             "verdict": str,
             "confidence": float,
             "explanation": str,
             "evidence": [
-                {{
+                {
                     "title": str,
                     "snippet": str,
                     "source": str,
                     "relevance": float
-                }}
+                }
             ],
             "timestamp": str
-        }}
+        }
         """
+
+def _unverified_result(explanation: str, timestamp: str) -> dict:
+    """Build the fallback result returned when a claim could not be verified.
+    
+    "error" tells it apart from a genuine UNVERIFIED verdict, so callers
+    don't cache it.
+    """
+    return {
+        "verdict": "UNVERIFIED",
+        "confidence": 0.0,
+        "explanation": explanation,
+        "evidence": [],
+        "timestamp": timestamp,
+        "error": True
+    }
+
+async def _generate_verdicts(model: genai.GenerativeModel, prompt: str):
+    """Request the batch verdicts within the shared Gemini rate limits."""
+    async with gemini_limiter:
+        return await model.generate_content_async(prompt)
+
+async def _verify_claims(claims: List[str], serper_api_key: str,
+                         known_evidence: List[Optional[List[Dict]]]) -> List[dict]:
+    """Verify several claims with one Serper fan-out and a single Gemini call.
+    
+    Claims whose evidence is already in known_evidence are not searched again.
+    """
+    timestamp = datetime.now().isoformat()
+    try:
+        model = get_model()
         
-        # Get response from Gemini
-        response = await model.generate_content_async(prompt)
-        result = response.text
+        # Search for the evidence that isn't already known
+        evidence_lists = list(known_evidence)
+        missing = [i for i, evidence in enumerate(evidence_lists) if evidence is None]
+        if missing:
+            searched = await search_evidence_batch([claims[i] for i in missing], serper_api_key)
+            for i, evidence in zip(missing, searched):
+                evidence_lists[i] = evidence
+        
+        # Create prompt with the evidence for each claim
+        claim_blocks = []
+        for i, (claim, evidence) in enumerate(zip(claims, evidence_lists)):
+            evidence_text = "\n".join([
+                f"Source {j+1}: {e['title']}\n{e['snippet']}\nURL: {e['source']}\n"
+                for j, e in enumerate(evidence)
+            ])
+            claim_blocks.append(f"CLAIM {i}: {claim}\n\nEvidence:\n{evidence_text}\n")
+        prompt = _PROOF_BATCH_PROMPT_TEMPLATE % "---\n".join(claim_blocks)
         
-        # Parse the response
+        if PROOF_SAGE_ANALYSIS:
+            # Get the Gemini verdicts and the Sage context analyses concurrently;
+            # both only depend on the evidence
+            response, *sage_analyses = await asyncio.gather(
+                _generate_verdicts(model, prompt),
+                *(run_sage_agent(claim, evidence)
+                  for claim, evidence in zip(claims, evidence_lists))
+            )
+        else:
+            response = await _generate_verdicts(model, prompt)
+            sage_analyses = [None] * len(claims)
+        result = response.text
+    except Exception as e:
+        logger.error("Error in proof agent: %s", e)
+        return [_unverified_result(str(e), timestamp) for _ in claims]
+    
+    # Parse the response
+    try:
+        verdicts = parse_json_response(result)
+        if not isinstance(verdicts, list):
+            raise ValueError("Expected a JSON array of verdicts")
+    except Exception as e:
+        logger.error("Error parsing Gemini response: %s", e)
+        return [_unverified_result("Error parsing response", timestamp) for _ in claims]
+    
+    results = []
+    for i, sage_analysis in enumerate(sage_analyses):
+        analysis = verdicts[i] if i < len(verdicts) else None
+        if not isinstance(analysis, dict):
+            results.append(_unverified_result("Missing verdict in batch response", timestamp))
+            continue
+        analysis['timestamp'] = timestamp
+        if sage_analysis is not None:
+            analysis['sage_analysis'] = sage_analysis
+        results.append(analysis)
+    return results
+
+class AsyncBatcher(ABC):
+    """Coalesces concurrent requests into batches processed together.
+    
+    A batch is flushed once it holds max_batch_size items, or max_queue_time
+    seconds after its first item arrived, whichever comes first. Subclasses
+    implement process_batch.
+    """
+    
+    def __init__(self, max_batch_size: int = 16, max_queue_time: float = 0.05):
+        self.max_batch_size = max_batch_size
+        self.max_queue_time = max_queue_time
+        self._pending: List[Tuple[Any, asyncio.Future]] = []
+        self._flush_timer: Optional[asyncio.TimerHandle] = None
+        self._running: set = set()
+    
+    async def process(self, item: Any) -> Any:
+        """Queue an item and wait for its result from the batch it lands in."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_timer is None:
+            self._flush_timer = loop.call_later(self.max_queue_time, self._flush)
+        return await future
+    
+    @abstractmethod
+    async def process_batch(self, items: List[Any]) -> List[Any]:
+        """Process a batch of items, returning one result per item in order."""
+    
+    def _flush(self) -> None:
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._run_batch(batch))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+    
+    async def _run_batch(self, batch: List[Tuple[Any, asyncio.Future]]) -> None:
+        items = [item for item, _ in batch]
         try:
-            analysis = eval(result)  # Simple parsing for now
-            analysis['timestamp'] = datetime.now().isoformat()
-            return analysis
+            results = await self.process_batch(items)
         except Exception as e:
-            logger.error(f"Error parsing Gemini response: {str(e)}")
-            return {
-                "verdict": "UNVERIFIED",
-                "confidence": 0.0,
-                "explanation": "Error parsing response",
-                "evidence": [],
-                "timestamp": datetime.now().isoformat()
-            }
-            
-    except Exception as e:
-        logger.error(f"Error in proof agent: {str(e)}")
-        return {
-            "verdict": "UNVERIFIED",
-            "confidence": 0.0,
-            "explanation": str(e),
-            "evidence": [],
-            "timestamp": datetime.now().isoformat()
-        }
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+class ProofBatcher(AsyncBatcher):
+    """Batches concurrent claim verifications into shared Serper/Gemini round trips."""
+    
+    async def process_batch(self, items: List[Tuple[str, str, Optional[List[Dict]]]]) -> List[dict]:
+        # Group by API key so each group can share one search fan-out
+        groups: Dict[str, List[int]] = {}
+        for i, (_, api_key, _) in enumerate(items):
+            groups.setdefault(api_key, []).append(i)
+        
+        grouped_results = await asyncio.gather(*(
+            _verify_claims([items[i][0] for i in indices], api_key,
+                           [items[i][2] for i in indices])
+            for api_key, indices in groups.items()
+        ))
+        
+        results: List[Optional[dict]] = [None] * len(items)
+        for indices, group_results in zip(groups.values(), grouped_results):
+            for i, result in zip(indices, group_results):
+                results[i] = result
+        return results
+
+_proof_batcher = ProofBatcher(max_batch_size=16, max_queue_time=0.05)
+
+def _known_verdict(claim: str) -> Optional[dict]:
+    """Return the verdict from the keyword heuristics or the verdict cache, if any."""
+    heuristic = _heuristic_verdict(claim)
+    if heuristic is not None:
+        return heuristic
+    
+    key = _claim_key(claim)
+    cached = _verdict_cache.get(key)
+    if cached is None:
+        cached = _disk_get(f"verdict:{key}")
+        if cached is not None:
+            _verdict_cache[key] = cached
+    return dict(cached) if cached is not None else None
+
+async def run_proof_agent(claim: str, serper_api_key: str) -> dict:
+    """
+    Verify a claim using evidence and Gemini.
+    
+    Claims decided by the local keyword heuristics return immediately;
+    concurrent calls for the rest are coalesced into a single batched verification.
+    
+    Args:
+        claim (str): The claim to verify
+        serper_api_key (str): Serper API key for evidence search
+        
+    Returns:
+        dict: Verification results including confidence and evidence
+    """
+    known = _known_verdict(claim)
+    if known is not None:
+        return known
+    return await _verify_unknown(claim, serper_api_key)
+
+async def _verify_unknown(claim: str, serper_api_key: str,
+                          evidence: Optional[List[Dict]] = None) -> dict:
+    """Verify a claim with no known verdict through the batcher, caching confident verdicts."""
+    result = await _proof_batcher.process((claim, serper_api_key, evidence))
+    
+    # Only reuse confident verdicts; failures and weak verdicts are retried
+    confidence = result.get("confidence")
+    if (result.get("verdict") != "UNVERIFIED"
+            and isinstance(confidence, (int, float))
+            and confidence >= VERDICT_CACHE_MIN_CONFIDENCE):
+        key = _claim_key(claim)
+        _verdict_cache[key] = dict(result)
+        _disk_set(f"verdict:{key}", result, VERDICT_CACHE_TTL)
+    return result
+
+async def stream_proof_agent(claim: str, serper_api_key: str) -> AsyncIterator[dict]:
+    """
+    Verify a claim like run_proof_agent, yielding a partial result as soon as
+    the evidence is in and the final result once Gemini has ruled on it.
+    
+    The partial result has verdict PENDING and "partial": True. Claims that are
+    decided by the heuristics or already cached yield only the final result.
+    
+    Args:
+        claim (str): The claim to verify
+        serper_api_key (str): Serper API key for evidence search
+        
+    Yields:
+        dict: Partial, then final verification results
+    """
+    known = _known_verdict(claim)
+    if known is not None:
+        yield known
+        return
+    
+    # The verification reuses this evidence, even if the search failed
+    evidence = await search_evidence(claim, serper_api_key)
+    yield {
+        "verdict": "PENDING",
+        "confidence": 0.0,
+        "explanation": "Evidence collected; verifying the claim...",
+        "evidence": evidence,
+        "timestamp": datetime.now().isoformat(),
+        "partial": True
+    }
+    yield await _verify_unknown(claim, serper_api_key, evidence)
 
 # For testing
 if __name__ == "__main__":
+    # Use uvloop's faster event loop when it is installed
+    try:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ImportError:
+        pass
+    
     test_claims = """The Earth is an oblate spheroid
 The Earth is flat
 Aliens created the pyramids"""
     
+    async def main(claims: List[str], serper_api_key: str) -> List[dict]:
+        """Verify the test claims concurrently, then release the shared session."""
+        try:
+            return await asyncio.gather(*(run_proof_agent(c, serper_api_key) for c in claims))
+        finally:
+            await close_session()
+    
     # Run test
-    try:
-        result = asyncio.run(run_proof_agent(test_claims))
-        print("\nFinal Results:")
-        print(json.dumps(result, indent=2))
-    except ValueError as e:
-        print(f"Error: {str(e)}")
+    serper_api_key = os.getenv("SERPER_API_KEY")
+    if not serper_api_key:
+        print("Error: SERPER_API_KEY not found")
         print("\nPlease make sure you have set the SERPER_API_KEY in your .env file:")
         print("SERPER_API_KEY=your_api_key_here")
+    else:
+        configure_from_env()
+        results = asyncio.run(main(test_claims.splitlines(), serper_api_key))
+        print("\nFinal Results:")
+        print(orjson.dumps(results, option=orjson.OPT_INDENT_2).decode())
@@ -1,19 +1,16 @@
-import os
 import json
+import asyncio
 import logging
-from typing import Dict, List, Optional
+from typing import Dict, List
 from datetime import datetime
-import google.generativeai as genai
-from dotenv import load_dotenv
+from . import _bootstrap  # noqa: F401
+from .parsing import parse_json_response
+from .rate_limit import gemini_limiter
+from .gemini import get_model, configure_from_env
 
-# Load environment variables
-load_dotenv()
-
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def run_sage_agent(claim: str, evidence: List[Dict], model=None) -> Dict:
+async def run_sage_agent(claim: str, evidence: List[Dict], model=None) -> Dict:
     """
     Run the Sage agent to provide additional analysis and context for claims.
     
@@ -28,17 +25,14 @@ def run_sage_agent(claim: str, evidence: List[Dict], model=None) -> Dict:
     try:
         # Initialize Gemini if not provided
         if not model:
-            api_key = os.getenv("GEMINI_API_KEY")
-            if not api_key:
+            if not configure_from_env():
                 logger.error("GEMINI_API_KEY not found")
                 return {
                     "status": "Error",
                     "confidence": 0.0,
                     "explanation": "API key not found"
                 }
-            
-            genai.configure(api_key=api_key)
-            model = genai.GenerativeModel('models/gemini-1.5-flash-latest')
+            model = get_model()
         
         # Prepare evidence for analysis
         evidence_text = "\n".join([
@@ -70,11 +64,12 @@ def run_sage_agent(claim: str, evidence: List[Dict], model=None) -> Dict:
         """
         
         # Get AI analysis
-        response = model.generate_content(prompt)
+        async with gemini_limiter:
+            response = await model.generate_content_async(prompt)
         
         try:
             # Parse the response as JSON
-            analysis = json.loads(response.text)
+            analysis = parse_json_response(response.text)
             
             # Ensure all required fields exist
             result = {
@@ -116,5 +111,5 @@ if __name__ == "__main__":
         }
     ]
     
-    result = run_sage_agent(test_claim, test_evidence)
+    result = asyncio.run(run_sage_agent(test_claim, test_evidence))
     print(json.dumps(result, indent=2)) 
\ No newline at end of file
@@ -2,21 +2,16 @@ import os
 import json
 import logging
 import asyncio
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional
 from datetime import datetime
-import aiohttp
-from dotenv import load_dotenv
 import google.generativeai as genai
 from dataclasses import dataclass
 from enum import Enum
+from . import _bootstrap  # noqa: F401
+from .parsing import parse_json_response
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Load environment variables
-load_dotenv()
-
 class BiasDirection(Enum):
     """Enum for political/ideological bias directions."""
     LEFT = "Left"
@@ -25,7 +20,7 @@ class BiasDirection(Enum):
     MIXED = "Mixed"
     UNKNOWN = "Unknown"
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class SearchResult:
     """Data class for search results."""
     title: str
@@ -34,6 +29,24 @@ class SearchResult:
     source: str
     date: Optional[str] = None
 
+# Static mock search results, built once rather than per call
+_MOCK_SEARCH_RESULTS = (
+    SearchResult(
+        title="Example Article 1",
+        snippet="This is a sample article about the topic.",
+        url="https://example.com/1",
+        source="Example News",
+        date="2024-03-20"
+    ),
+    SearchResult(
+        title="Example Article 2",
+        snippet="Another perspective on the subject.",
+        url="https://example.com/2",
+        source="Sample Media",
+        date="2024-03-19"
+    )
+)
+
 class ContextNetAgent:
     """Agent for providing context and bias analysis on claims or topics."""
     
@@ -124,22 +137,7 @@ class ContextNetAgent:
     
     def _get_mock_search_results(self, claim: str) -> List[SearchResult]:
         """Generate mock search results for testing."""
-        return [
-            SearchResult(
-                title="Example Article 1",
-                snippet="This is a sample article about the topic.",
-                url="https://example.com/1",
-                source="Example News",
-                date="2024-03-20"
-            ),
-            SearchResult(
-                title="Example Article 2",
-                snippet="Another perspective on the subject.",
-                url="https://example.com/2",
-                source="Sample Media",
-                date="2024-03-19"
-            )
-        ]
+        return list(_MOCK_SEARCH_RESULTS)
     
     async def _extract_entities(self, claim: str) -> List[Dict]:
         """Extract named entities from the claim."""
@@ -220,7 +218,7 @@ class ContextNetAgent:
             
             try:
                 # Parse the response as JSON
-                analysis = json.loads(response.text)
+                analysis = parse_json_response(response.text)
                 return analysis
             except json.JSONDecodeError:
                 logger.error("Failed to parse AI response as JSON")
@@ -251,4 +249,11 @@ async def main():
     print(json.dumps(result, indent=2))
 
 if __name__ == "__main__":
+    # Use uvloop's faster event loop when it is installed
+    try:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ImportError:
+        pass
+    
     asyncio.run(main()) 
\ No newline at end of file
@@ -0,0 +1,39 @@
+import os
+import threading
+from typing import Optional
+import google.generativeai as genai
+
+GEMINI_MODEL_NAME = 'models/gemini-1.5-flash-latest'
+
+# Shared Gemini model, created on first use. Streamlit runs sessions on
+# separate threads, so creation is guarded by a lock.
+_model: Optional[genai.GenerativeModel] = None
+_model_lock = threading.Lock()
+_configured_key: Optional[str] = None
+
+def get_model() -> genai.GenerativeModel:
+    """Return the shared Gemini model, creating it on first use."""
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                _model = genai.GenerativeModel(GEMINI_MODEL_NAME)
+    return _model
+
+def configure_from_env() -> bool:
+    """
+    Configure Gemini with GEMINI_API_KEY, skipping the call if that key is
+    already configured.
+    
+    Returns:
+        bool: False if GEMINI_API_KEY is not set
+    """
+    global _configured_key
+    api_key = os.getenv("GEMINI_API_KEY")
+    if not api_key:
+        return False
+    if api_key != _configured_key:
+        with _model_lock:
+            genai.configure(api_key=api_key)
+            _configured_key = api_key
+    return True
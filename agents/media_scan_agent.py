@@ -1,21 +1,180 @@
+import io
 import os
+import re
+import copy
 import json
+import hashlib
 import logging
 import asyncio
-from typing import Dict, List, Optional, Tuple
+import multiprocessing
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
 from datetime import datetime
-from PIL import Image, ImageStat
-import exifread
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image, ImageChops, ExifTags
 import google.generativeai as genai
-from dotenv import load_dotenv
 import numpy as np
+from cachetools import LRUCache
+from . import _bootstrap  # noqa: F401
+from .rate_limit import gemini_limiter
+from .forensics_kernels import channel_stats, tile_statistics, blockiness, to_planes
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Load environment variables
-load_dotenv()
+# Common standard resolutions, as a set for O(1) membership checks
+STANDARD_RESOLUTIONS = frozenset({
+    (1920, 1080),  # Full HD
+    (1280, 720),   # HD
+    (3840, 2160),  # 4K
+    (2560, 1440),  # 2K
+    (800, 600),    # SVGA
+    (1024, 768),   # XGA
+})
+
+# Long-edge size, in pixels, images are downsampled to for forensics analysis
+FORENSICS_MAX_SIZE = 512
+DOWNSAMPLE_REDUCING_GAP = 2.0
+
+# Error Level Analysis re-encodes a copy downscaled to this long edge
+ELA_MAX_SIZE = 1024
+ELA_JPEG_QUALITY = 90
+ELA_REGION_RATIO = 3.0  # Tile error over the median tile error that marks a region
+
+# Forensics tile size and the thresholds above which a check is flagged
+FORENSICS_BLOCK_SIZE = 32
+NOISE_VARIATION_THRESHOLD = 0.5  # Std/mean of per-tile noise levels
+ARTIFACT_SCORE_THRESHOLD = 0.3  # Excess luminance step on the 8x8 grid
+COLOR_INCONSISTENCY_THRESHOLD = 0.2  # Std of per-tile channel correlations
+
+MEDIA_CACHE_SIZE = 128  # Analyses kept per agent, keyed by file content hash
+
+# EXIF sub-IFDs read alongside the main IFD, with the key prefix used for
+# each (matching exifread's "Image Make" / "EXIF DateTimeOriginal" naming)
+_EXIF_SUB_IFDS = (
+    (ExifTags.IFD.Exif, "EXIF", ExifTags.TAGS),
+    (ExifTags.IFD.GPSInfo, "GPS", ExifTags.GPSTAGS),
+)
+_EXIF_MAKER_NOTE = 0x927C  # Vendor binary blob, not useful as text
+
+# Bits for the tags the anomaly checks look at, so each image's tag presence
+# is folded into one int and tested with bitwise AND
+_TAG_BITS = {
+    "EXIF DateTimeOriginal": 1,
+    "EXIF DateTimeDigitized": 2,
+    "Image Make": 4,
+    "Image Model": 8,
+}
+_BOTH_EXIF_DATES = _TAG_BITS["EXIF DateTimeOriginal"] | _TAG_BITS["EXIF DateTimeDigitized"]
+
+# Tags whose absence is reported as a metadata anomaly
+_CRITICAL_EXIF = _TAG_BITS["EXIF DateTimeOriginal"] | _TAG_BITS["Image Make"] | _TAG_BITS["Image Model"]
+
+def _read_exif(img: Image.Image) -> Dict[str, str]:
+    """Return the image's EXIF tags as a flat dict of names to string values."""
+    exif = img.getexif()
+    sub_ifd_pointers = {ifd for ifd, _, _ in _EXIF_SUB_IFDS}
+    exif_data = {
+        f"Image {ExifTags.TAGS.get(tag, tag)}": str(value)
+        for tag, value in exif.items()
+        if tag not in sub_ifd_pointers
+    }
+    for ifd, prefix, names in _EXIF_SUB_IFDS:
+        for tag, value in exif.get_ifd(ifd).items():
+            if tag != _EXIF_MAKER_NOTE:
+                exif_data[f"{prefix} {names.get(tag, tag)}"] = str(value)
+    return exif_data
+
+# Gemini prompt template, built once at import and filled with %-substitution
+_MEDIA_PROMPT_TEMPLATE = """
+            Analyze this image for potential manipulation or AI generation. Consider the following aspects:
+
+            1. Metadata Analysis:
+            - Creation Date: %(creation_date)s
+            - File Size: %(file_size)s bytes
+            - Metadata Anomalies: %(anomalies)s
+            - EXIF Data: %(exif_data)s
+
+            2. Image Properties:
+            - Resolution: %(width)sx%(height)s
+            - Format: %(format)s
+            - Aspect Ratio: %(aspect_ratio)s
+            - Quality Metrics: %(quality_metrics)s
+
+            3. Forensics Analysis:
+%(forensics)s
+
+            4. Search Results:
+            %(search_results)s
+
+            Please provide a detailed analysis addressing:
+            1. Are there any suspicious patterns in the metadata or image properties?
+            2. Does the forensics analysis reveal any signs of manipulation?
+            3. Does the image appear to be AI-generated? If so, what are the indicators?
+            4. What is your confidence level in this assessment (0-1)?
+            5. What specific evidence supports your conclusion?
+
+            Format your response as a structured analysis with clear sections and confidence scores.
+            """
+
+# Forensics checks in prompt order, with their display labels
+_FORENSICS_LABELS = (
+    ("error_level_analysis", "Error Level Analysis"),
+    ("noise_analysis", "Noise Analysis"),
+    ("compression_artifacts", "Compression Artifacts"),
+    ("color_consistency", "Color Consistency"),
+)
+
+# First 0-1 score following "confidence" in the model's free-text analysis,
+# skipping a "(0-1)" echoed back from the prompt
+_CONFIDENCE_PATTERN = re.compile(
+    r"confidence(?:[^0-9\n]|\(0\s*-\s*1\)){0,40}?\b(0(?:\.\d+)?|1(?:\.0+)?)\b(?!\s*-)",
+    re.IGNORECASE
+)
+
+def _extract_confidence(text: str) -> float:
+    """Pull the confidence score out of the model's analysis, or 0.0 if absent."""
+    match = _CONFIDENCE_PATTERN.search(text)
+    return float(match.group(1)) if match else 0.0
+
+def _compact_json(value) -> str:
+    """Serialize a value as JSON without whitespace, to keep the prompt short."""
+    return json.dumps(value, separators=(',', ':'))
+
+def _read_bytes(path: str) -> bytes:
+    """Read a whole file in one call."""
+    with open(path, 'rb') as f:
+        return f.read()
+
+async def _read_bytes_async(path: str) -> bytes:
+    """Read a whole file in a worker thread, keeping the event loop free."""
+    return await asyncio.to_thread(_read_bytes, path)
+
+def _content_key(data: bytes) -> str:
+    """Hash file contents into the analysis cache key."""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+def _downsample(img: Image.Image, max_size: int) -> Image.Image:
+    """Return img scaled to fit max_size on its long edge, leaving img unchanged."""
+    long_edge = max(img.size)
+    if long_edge <= max_size:
+        return img
+    scale = max_size / long_edge
+    size = (max(1, round(img.width * scale)), max(1, round(img.height * scale)))
+    # reducing_gap box-reduces by an integer factor before the bilinear pass,
+    # much cheaper on large photos with no visible loss at these sizes
+    return img.resize(size, Image.Resampling.BILINEAR, reducing_gap=DOWNSAMPLE_REDUCING_GAP)
+
+# Downscaled copies kept per image, keyed by their long-edge limit. Each level
+# is resized from the one above it, largest first.
+_PYRAMID_LEVELS = (ELA_MAX_SIZE, FORENSICS_MAX_SIZE)
+
+def _build_pyramid(img: Image.Image) -> Dict[int, Image.Image]:
+    """Downscale img once per pyramid level, for the checks to pick from."""
+    pyramid = {}
+    level = img
+    for max_size in _PYRAMID_LEVELS:
+        level = _downsample(level, max_size)
+        pyramid[max_size] = level
+    return pyramid
 
 class MediaScanAgent:
     """Agent for analyzing images using metadata, forensics, and AI-powered analysis."""
@@ -33,30 +192,50 @@ class MediaScanAgent:
             self.model = None
             logger.warning("Gemini API key not found. AI analysis will be limited.")
         
-    async def analyze_media(self, media_path: str) -> Dict:
+        # Completed analyses keyed by content hash, so resubmitting the same
+        # image skips decoding, forensics and the Gemini call
+        self._cache: LRUCache = LRUCache(maxsize=MEDIA_CACHE_SIZE)
+        
+    async def analyze_media(self, media_path: str,
+                            on_chunk: Optional[Callable[[str], None]] = None) -> Dict:
         """
         Analyze image for potential manipulation or AI generation.
         
         Args:
             media_path: Path to the image file
+            on_chunk: Optional callback receiving the AI analysis text as it
+                streams in, so a UI can render it before the call completes
             
         Returns:
             Dict containing analysis results
         """
+        return await self._analyze(media_path, self._analyze_local, on_chunk)
+    
+    async def _analyze(self, media_path: str,
+                       analyze_local: Callable[[str, bytes], Awaitable[Tuple[Dict, Dict, Dict]]],
+                       on_chunk: Optional[Callable[[str], None]] = None) -> Dict:
+        """Analyze an image, running the metadata and pixel checks with analyze_local."""
         try:
             # Basic file validation
             if not os.path.exists(media_path):
                 raise FileNotFoundError(f"Image file not found: {media_path}")
             
-            # Extract metadata and image properties
-            metadata = await self._extract_metadata(media_path)
-            image_properties = await self._analyze_image_properties(media_path)
+            data = await _read_bytes_async(media_path)
+            key = _content_key(data)
+            cached = self._cache.get(key)
+            if cached is not None:
+                result = copy.deepcopy(cached)
+                result["file_path"] = media_path
+                if on_chunk is not None:
+                    on_chunk(result["reasoning"])
+                return result
             
-            # Perform image forensics analysis
-            forensics = await self._perform_forensics_analysis(media_path)
-            
-            # Perform reverse image search
-            search_results = await self._reverse_image_search(media_path)
+            # Run the local metadata and pixel checks off the event loop,
+            # overlapping them with the reverse image search
+            (metadata, image_properties, forensics), search_results = await asyncio.gather(
+                analyze_local(media_path, data),
+                self._reverse_image_search(media_path)
+            )
             
             # Perform AI analysis
             ai_analysis = await self._analyze_with_ai(
@@ -64,7 +243,8 @@ class MediaScanAgent:
                 metadata, 
                 image_properties,
                 forensics,
-                search_results
+                search_results,
+                on_chunk
             )
             
             # Combine results
@@ -82,6 +262,7 @@ class MediaScanAgent:
                 "explanation": ai_analysis.get("reasoning", "")
             }
             
+            self._cache[key] = copy.deepcopy(result)
             return result
             
         except Exception as e:
@@ -91,10 +272,47 @@ class MediaScanAgent:
                 "status": "failed"
             }
     
-    async def _extract_metadata(self, media_path: str) -> Dict:
-        """Extract and analyze metadata from image file."""
+    async def scan_batch(self, paths: List[str], max_workers: Optional[int] = None) -> List[Dict]:
+        """
+        Analyze many images in parallel, one worker process per core.
+        
+        Only the decoding and the pixel checks run in the workers; the Gemini
+        calls are made from this process, within the shared rate limits.
+        
+        Args:
+            paths: Paths to the image files
+            max_workers: Worker processes to use, defaulting to the CPU count
+            
+        Returns:
+            List of analysis results, in the same order as paths
+        """
+        loop = asyncio.get_running_loop()
+        # Spawn rather than fork: the Numba thread pool is already running here
+        with ProcessPoolExecutor(max_workers=max_workers,
+                                 mp_context=multiprocessing.get_context("spawn")) as pool:
+            def analyze_local(media_path: str, data: bytes):
+                return loop.run_in_executor(pool, _analyze_local_sync, media_path, data)
+            
+            results = await asyncio.gather(
+                *(self._analyze(path, analyze_local) for path in paths),
+                return_exceptions=True
+            )
+        
+        for i, result in enumerate(results):
+            if isinstance(result, Exception):
+                logger.error(f"Error analyzing media in batch: {str(result)}")
+                results[i] = {
+                    "error": str(result),
+                    "status": "failed"
+                }
+        return results
+    
+    def _extract_metadata(self, media_path: str, img: Optional[Image.Image]) -> Dict:
+        """Extract and analyze metadata from the image file and its decoded EXIF."""
+        # One stat call for the size and both file dates
+        file_stat = os.stat(media_path)
         metadata = {
-            "file_size": os.path.getsize(media_path),
+            "file_size": file_stat.st_size,
             "creation_date": None,
             "modification_date": None,
             "exif_data": {},
@@ -103,164 +321,226 @@ class MediaScanAgent:
         
         try:
             # Get basic file dates
-            metadata["creation_date"] = datetime.fromtimestamp(
-                os.path.getctime(media_path)
-            ).isoformat()
-            metadata["modification_date"] = datetime.fromtimestamp(
-                os.path.getmtime(media_path)
-            ).isoformat()
+            metadata["creation_date"] = datetime.fromtimestamp(file_stat.st_ctime).isoformat()
+            metadata["modification_date"] = datetime.fromtimestamp(file_stat.st_mtime).isoformat()
             
-            # Extract EXIF data
-            with open(media_path, 'rb') as f:
-                exif = exifread.process_file(f)
-                metadata["exif_data"] = {
-                    str(tag): str(value)
-                    for tag, value in exif.items()
-                }
+            # Extract EXIF data, already parsed by Pillow when the image was opened
+            if img is not None:
+                metadata["exif_data"] = _read_exif(img)
             
             # Check for metadata anomalies
-            metadata["anomalies"] = self._check_metadata_anomalies(metadata)
+            metadata["anomalies"] = self._check_metadata_anomalies(metadata["exif_data"], file_stat)
                     
         except Exception as e:
             logger.warning(f"Error extracting metadata: {str(e)}")
             
         return metadata
     
-    def _check_metadata_anomalies(self, metadata: Dict) -> List[str]:
-        """Check for suspicious patterns in metadata."""
+    def _check_metadata_anomalies(self, exif: Dict[str, str], file_stat: os.stat_result) -> List[str]:
+        """Check for suspicious patterns in the EXIF data and file dates."""
         anomalies = []
         
-        # Check creation vs modification dates
-        if metadata["creation_date"] and metadata["modification_date"]:
-            creation = datetime.fromisoformat(metadata["creation_date"])
-            modification = datetime.fromisoformat(metadata["modification_date"])
-            if modification < creation:
-                anomalies.append("Modification date is earlier than creation date")
+        # Check creation vs modification dates, on the raw timestamps
+        if file_stat.st_mtime < file_stat.st_ctime:
+            anomalies.append("Modification date is earlier than creation date")
+        
+        present_mask = 0
+        for tag in exif:
+            present_mask |= _TAG_BITS.get(tag, 0)
         
         # Check EXIF data
-        exif = metadata["exif_data"]
-        if "EXIF DateTimeOriginal" in exif and "EXIF DateTimeDigitized" in exif:
+        if present_mask & _BOTH_EXIF_DATES == _BOTH_EXIF_DATES:
             if exif["EXIF DateTimeOriginal"] != exif["EXIF DateTimeDigitized"]:
                 anomalies.append("Original and digitized dates don't match")
         
         # Check for missing critical EXIF data
-        critical_tags = ["EXIF DateTimeOriginal", "EXIF Make", "EXIF Model"]
-        missing_tags = [tag for tag in critical_tags if tag not in exif]
-        if missing_tags:
+        missing_mask = _CRITICAL_EXIF & ~present_mask
+        if missing_mask:
+            missing_tags = [tag for tag, bit in _TAG_BITS.items() if missing_mask & bit]
             anomalies.append(f"Missing critical EXIF data: {', '.join(missing_tags)}")
         
         return anomalies
     
-    async def _analyze_image_properties(self, media_path: str) -> Dict:
+    def _load_image(self, data: bytes) -> Optional[Tuple[Image.Image, Image.Image, Dict[int, Image.Image]]]:
+        """Decode the image once from its file bytes, returning it as opened,
+        converted to RGB, and as a pyramid of downscaled RGB copies."""
+        try:
+            img = Image.open(io.BytesIO(data))
+            img.load()
+        except Exception as e:
+            logger.warning(f"Error loading image: {str(e)}")
+            return None
+        rgb = img if img.mode == 'RGB' else img.convert('RGB')
+        return img, rgb, _build_pyramid(rgb)
+    
+    def _analyze_local_sync(self, media_path: str, data: bytes) -> Tuple[Dict, Dict, Dict]:
+        """Run the checks of _analyze_local one after another, for a worker process."""
+        image = self._load_image(data)
+        if image is None:
+            return self._extract_metadata(media_path, None), {}, {}
+        return (
+            self._extract_metadata(media_path, image[0]),
+            self._analyze_image_properties(image),
+            self._perform_forensics_analysis(image[1], image[2])
+        )
+    
+    async def _analyze_local(self, media_path: str, data: bytes) -> Tuple[Dict, Dict, Dict]:
+        """Decode the already-read image bytes once and run the metadata,
+        properties and forensics checks on the result."""
+        image = await asyncio.to_thread(self._load_image, data)
+        if image is None:
+            metadata = await asyncio.to_thread(self._extract_metadata, media_path, None)
+            return metadata, {}, {}
+        return await asyncio.gather(
+            asyncio.to_thread(self._extract_metadata, media_path, image[0]),
+            asyncio.to_thread(self._analyze_image_properties, image),
+            asyncio.to_thread(self._perform_forensics_analysis, image[1], image[2])
+        )
+    
+    def _analyze_image_properties(self, image: Tuple[Image.Image, Image.Image, Dict[int, Image.Image]]) -> Dict:
         """Analyze basic image properties and quality metrics."""
         try:
-            with Image.open(media_path) as img:
-                # Convert to RGB if needed
-                if img.mode != 'RGB':
-                    img = img.convert('RGB')
-                
-                # Calculate image statistics
-                stat = ImageStat.Stat(img)
-                
-                # Get basic properties
-                properties = {
-                    "format": img.format,
-                    "mode": img.mode,
-                    "size": img.size,
-                    "width": img.width,
-                    "height": img.height,
-                    "dpi": img.info.get('dpi', None),
-                    "compression": img.info.get('compression', None),
-                    "quality_metrics": {
-                        "brightness": stat.mean[0],
-                        "contrast": stat.stddev[0],
-                        "color_balance": {
-                            "red": stat.mean[0],
-                            "green": stat.mean[1],
-                            "blue": stat.mean[2]
-                        }
+            original, img, _ = image
+            
+            # Per-channel mean and stddev in one pass over the pixels
+            means, stds = channel_stats(np.asarray(img))
+            
+            # Get basic properties
+            properties = {
+                "format": original.format,
+                "mode": img.mode,
+                "size": img.size,
+                "width": img.width,
+                "height": img.height,
+                "dpi": original.info.get('dpi', None),
+                "compression": original.info.get('compression', None),
+                "quality_metrics": {
+                    "brightness": float(means[0]),
+                    "contrast": float(stds[0]),
+                    "color_balance": {
+                        "red": float(means[0]),
+                        "green": float(means[1]),
+                        "blue": float(means[2])
                     }
                 }
-                
-                # Add aspect ratio
-                properties["aspect_ratio"] = round(img.width / img.height, 2)
-                
-                # Check for common image dimensions
-                properties["is_standard_resolution"] = self._is_standard_resolution(img.width, img.height)
-                
-                return properties
-                
+            }
+            
+            # Add aspect ratio
+            properties["aspect_ratio"] = round(img.width / img.height, 2)
+            
+            # Check for common image dimensions
+            properties["is_standard_resolution"] = self._is_standard_resolution(img.width, img.height)
+            
+            return properties
+            
         except Exception as e:
             logger.warning(f"Error analyzing image properties: {str(e)}")
             return {}
     
     def _is_standard_resolution(self, width: int, height: int) -> bool:
         """Check if image dimensions match common standard resolutions."""
-        common_resolutions = [
-            (1920, 1080),  # Full HD
-            (1280, 720),   # HD
-            (3840, 2160),  # 4K
-            (2560, 1440),  # 2K
-            (800, 600),    # SVGA
-            (1024, 768),   # XGA
-        ]
-        return (width, height) in common_resolutions
+        return (width, height) in STANDARD_RESOLUTIONS
     
-    async def _perform_forensics_analysis(self, media_path: str) -> Dict:
-        """Perform basic image forensics analysis."""
+    def _perform_forensics_analysis(self, img: Image.Image, pyramid: Dict[int, Image.Image]) -> Dict:
+        """Perform basic image forensics analysis on the decoded RGB image."""
         try:
-            with Image.open(media_path) as img:
-                # Convert to RGB if needed
-                if img.mode != 'RGB':
-                    img = img.convert('RGB')
-                
-                # Convert to numpy array for analysis
-                img_array = np.array(img)
-                
-                # Basic forensics checks
-                forensics = {
-                    "error_level_analysis": self._error_level_analysis(img_array),
-                    "noise_analysis": self._analyze_noise(img_array),
-                    "compression_artifacts": self._check_compression_artifacts(img_array),
-                    "color_consistency": self._check_color_consistency(img_array)
-                }
-                
-                return forensics
-                
+            # Block artifacts sit on the original 8x8 grid, so they are checked
+            # at full resolution; the other checks run on a downsampled level
+            full_array = np.asarray(img)
+            img_array = np.asarray(pyramid[FORENSICS_MAX_SIZE])
+            
+            # Noise levels and channel correlations share one pass over the tiles,
+            # reading each channel from its own contiguous plane
+            noise_levels, correlations = tile_statistics(to_planes(img_array), FORENSICS_BLOCK_SIZE)
+            
+            # Basic forensics checks
+            forensics = {
+                "error_level_analysis": self._error_level_analysis(img, pyramid[ELA_MAX_SIZE]),
+                "noise_analysis": self._analyze_noise(noise_levels),
+                "compression_artifacts": self._check_compression_artifacts(full_array),
+                "color_consistency": self._check_color_consistency(correlations)
+            }
+            
+            return forensics
+            
         except Exception as e:
             logger.warning(f"Error in forensics analysis: {str(e)}")
             return {}
     
-    def _error_level_analysis(self, img_array: np.ndarray) -> Dict:
-        """Perform Error Level Analysis (ELA) to detect edited regions."""
-        # TODO: Implement proper ELA
+    def _error_level_analysis(self, img: Image.Image, small: Image.Image) -> Dict:
+        """Perform Error Level Analysis (ELA) to detect edited regions.
+        
+        Re-saves the image as JPEG and diffs it against itself; regions pasted
+        in from another source recompress differently from the rest. Runs on
+        small, a copy of img downscaled to ELA_MAX_SIZE, which keeps the signal
+        at a fraction of the cost; regions are reported in img's coordinates.
+        """
+        buffer = io.BytesIO()
+        small.save(buffer, 'JPEG', quality=ELA_JPEG_QUALITY)
+        buffer.seek(0)
+        recompressed = Image.open(buffer)
+        error = np.asarray(ImageChops.difference(small, recompressed)).max(axis=2)
+        
+        # Mean error per tile, cropping the partial tiles at the edges
+        block = FORENSICS_BLOCK_SIZE
+        rows, cols = error.shape[0] // block, error.shape[1] // block
+        if rows == 0 or cols == 0:
+            return {
+                "score": 0.0,
+                "suspicious_regions": []
+            }
+        tiles = error[:rows * block, :cols * block].reshape(rows, block, cols, block).mean(axis=(1, 3))
+        
+        # Tiles well above the image's typical error level are suspicious
+        flagged = tiles > ELA_REGION_RATIO * (np.median(tiles) + 1.0)
+        scale = img.width / small.width
+        size = round(block * scale)
+        suspicious_regions = [
+            {"x": round(j * block * scale), "y": round(i * block * scale), "width": size, "height": size}
+            for i, j in np.argwhere(flagged).tolist()
+        ]
         return {
-            "score": 0.0,
-            "suspicious_regions": []
+            "score": float(flagged.mean()),
+            "suspicious_regions": suspicious_regions
         }
     
-    def _analyze_noise(self, img_array: np.ndarray) -> Dict:
-        """Analyze image noise patterns."""
-        # TODO: Implement noise analysis
+    def _analyze_noise(self, levels: np.ndarray) -> Dict:
+        """Analyze image noise patterns from the per-tile Laplacian deviations."""
+        if levels.size == 0:
+            return {
+                "noise_level": 0.0,
+                "noise_pattern": "unknown"
+            }
+        
+        # Spliced regions tend to carry noise that differs from the rest of the image
+        noise_level = float(np.median(levels))
+        variation = float(levels.std() / (levels.mean() + 1e-6))
         return {
-            "noise_level": 0.0,
-            "noise_pattern": "unknown"
+            "noise_level": noise_level,
+            "noise_pattern": "inconsistent" if variation > NOISE_VARIATION_THRESHOLD else "consistent"
         }
     
     def _check_compression_artifacts(self, img_array: np.ndarray) -> Dict:
-        """Check for compression artifacts."""
-        # TODO: Implement compression artifact detection
+        """Check for JPEG block artifacts along the 8x8 grid."""
+        ratio = float(blockiness(img_array, 8))
+        artifact_score = min(1.0, max(0.0, ratio - 1.0))
         return {
-            "has_artifacts": False,
-            "artifact_score": 0.0
+            "has_artifacts": artifact_score > ARTIFACT_SCORE_THRESHOLD,
+            "artifact_score": artifact_score
         }
     
-    def _check_color_consistency(self, img_array: np.ndarray) -> Dict:
-        """Check color consistency across the image."""
-        # TODO: Implement color consistency analysis
+    def _check_color_consistency(self, correlations: np.ndarray) -> Dict:
+        """Check color consistency via the spread of per-tile channel correlations."""
+        if correlations.size == 0:
+            return {
+                "is_consistent": True,
+                "inconsistency_score": 0.0
+            }
+        
+        inconsistency_score = min(1.0, float(correlations.std()))
         return {
-            "is_consistent": True,
-            "inconsistency_score": 0.0
+            "is_consistent": inconsistency_score <= COLOR_INCONSISTENCY_THRESHOLD,
+            "inconsistency_score": inconsistency_score
         }
     
     async def _reverse_image_search(self, media_path: str) -> Dict:
@@ -275,9 +555,17 @@ class MediaScanAgent:
             "confidence": 0.0
         }
     
+    async def _stream_ai_text(self, prompt: str) -> AsyncIterator[str]:
+        """Yield the Gemini analysis text chunk by chunk as it is generated."""
+        async with gemini_limiter:
+            response = await self.model.generate_content_async(prompt, stream=True)
+            async for chunk in response:
+                yield chunk.text
+    
     async def _analyze_with_ai(self, media_path: str, metadata: Dict, 
                              image_properties: Dict, forensics: Dict, 
-                             search_results: Dict) -> Dict:
+                             search_results: Dict,
+                             on_chunk: Optional[Callable[[str], None]] = None) -> Dict:
         """Analyze image using Gemini API with enhanced prompt engineering."""
         try:
             if not self.model:
@@ -287,48 +575,19 @@ class MediaScanAgent:
                     "details": {}
                 }
             
-            # Create detailed prompt for Gemini
-            prompt = f"""
-            Analyze this image for potential manipulation or AI generation. Consider the following aspects:
-
-            1. Metadata Analysis:
-            - Creation Date: {metadata.get('creation_date')}
-            - File Size: {metadata.get('file_size')} bytes
-            - Metadata Anomalies: {metadata.get('anomalies', [])}
-            - EXIF Data: {json.dumps(metadata.get('exif_data', {}), indent=2)}
-
-            2. Image Properties:
-            - Resolution: {image_properties.get('width')}x{image_properties.get('height')}
-            - Format: {image_properties.get('format')}
-            - Aspect Ratio: {image_properties.get('aspect_ratio')}
-            - Quality Metrics: {json.dumps(image_properties.get('quality_metrics', {}), indent=2)}
-
-            3. Forensics Analysis:
-            - Error Level Analysis: {json.dumps(forensics.get('error_level_analysis', {}), indent=2)}
-            - Noise Analysis: {json.dumps(forensics.get('noise_analysis', {}), indent=2)}
-            - Compression Artifacts: {json.dumps(forensics.get('compression_artifacts', {}), indent=2)}
-            - Color Consistency: {json.dumps(forensics.get('color_consistency', {}), indent=2)}
-
-            4. Search Results:
-            {json.dumps(search_results, indent=2)}
-
-            Please provide a detailed analysis addressing:
-            1. Are there any suspicious patterns in the metadata or image properties?
-            2. Does the forensics analysis reveal any signs of manipulation?
-            3. Does the image appear to be AI-generated? If so, what are the indicators?
-            4. What is your confidence level in this assessment (0-1)?
-            5. What specific evidence supports your conclusion?
-
-            Format your response as a structured analysis with clear sections and confidence scores.
-            """
+            prompt = self._build_prompt(metadata, image_properties, forensics, search_results)
             
-            # Get AI analysis
-            response = await self.model.generate_content(prompt)
-            analysis = response.text
+            # Get AI analysis, handing each chunk on as it arrives
+            chunks = []
+            async for text in self._stream_ai_text(prompt):
+                chunks.append(text)
+                if on_chunk is not None:
+                    on_chunk(text)
+            analysis = "".join(chunks)
             
             # Parse the response and structure it
             return {
-                "confidence": 0.0,  # TODO: Extract confidence from response
+                "confidence": _extract_confidence(analysis),
                 "reasoning": analysis,
                 "details": {
                     "metadata_analysis": "TODO",
@@ -346,6 +605,32 @@ class MediaScanAgent:
                 "details": {}
             }
     
+    def _build_prompt(self, metadata: Dict, image_properties: Dict,
+                      forensics: Dict, search_results: Dict) -> str:
+        """Fill the Gemini prompt template, leaving out checks that produced nothing."""
+        forensics_lines = "\n".join(
+            f"            - {label}: {_compact_json(forensics[key])}"
+            for key, label in _FORENSICS_LABELS
+            if forensics.get(key)
+        ) or "            - Not available"
+        search_section = (
+            _compact_json(search_results) if search_results.get("matches")
+            else "No matches found"
+        )
+        return _MEDIA_PROMPT_TEMPLATE % {
+            "creation_date": metadata.get('creation_date'),
+            "file_size": metadata.get('file_size'),
+            "anomalies": metadata.get('anomalies', []),
+            "exif_data": _compact_json(metadata.get('exif_data', {})),
+            "width": image_properties.get('width'),
+            "height": image_properties.get('height'),
+            "format": image_properties.get('format'),
+            "aspect_ratio": image_properties.get('aspect_ratio'),
+            "quality_metrics": _compact_json(image_properties.get('quality_metrics', {})),
+            "forensics": forensics_lines,
+            "search_results": search_section
+        }
+    
     def _determine_verdict(self, analysis: Dict) -> str:
         """Determine the final verdict based on analysis results."""
         confidence = analysis.get("confidence", 0.0)
@@ -357,6 +642,15 @@ class MediaScanAgent:
         else:
             return "Authentic"
 
+_worker_agent: Optional[MediaScanAgent] = None  # One per scan_batch worker process
+
+def _analyze_local_sync(media_path: str, data: bytes) -> Tuple[Dict, Dict, Dict]:
+    """Run the local checks for one image in a scan_batch worker process."""
+    global _worker_agent
+    if _worker_agent is None:
+        _worker_agent = MediaScanAgent()
+    return _worker_agent._analyze_local_sync(media_path, data)
+
 async def main():
     """Example usage of the MediaScan agent."""
     agent = MediaScanAgent()
@@ -364,4 +658,11 @@ async def main():
     print(json.dumps(result, indent=2))
 
 if __name__ == "__main__":
+    # Use uvloop's faster event loop when it is installed
+    try:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ImportError:
+        pass
+    
     asyncio.run(main()) 
\ No newline at end of file
@@ -0,0 +1,29 @@
+import re
+import ast
+import orjson
+from typing import Any
+
+# Markdown code fence Gemini often wraps around JSON answers
+_FENCE = re.compile(r"^```(?:json)?\s*|\s*```$")
+
+def parse_json_response(text: str) -> Any:
+    """
+    Parse a JSON payload from a model response, stripping any markdown code fence.
+    
+    Falls back to ast.literal_eval for Python-style literals (single quotes,
+    True/None); if that also fails, the original JSON error is raised.
+    
+    Args:
+        text (str): The raw response text
+        
+    Returns:
+        Any: The parsed payload
+    """
+    cleaned = _FENCE.sub("", text.strip())
+    try:
+        return orjson.loads(cleaned)
+    except orjson.JSONDecodeError as e:
+        try:
+            return ast.literal_eval(cleaned)
+        except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+            raise e from None
@@ -0,0 +1,73 @@
+import time
+import asyncio
+import logging
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Limits for the external APIs shared by all agents
+SERPER_MAX_CONCURRENCY = 8  # Max in-flight Serper requests
+SERPER_RPM = 300  # Max Serper requests per minute
+GEMINI_MAX_CONCURRENCY = 4  # Max in-flight Gemini requests
+GEMINI_RPM = 60  # Max Gemini requests per minute
+
+RATE_WINDOW = 60.0  # Seconds in the sliding window for per-minute caps
+
+class RateLimiter:
+    """Caps in-flight calls and calls per minute to an external API.
+    
+    Used as an async context manager around each request. The semaphore is
+    bound to the running event loop, so a new one is created if the limiter
+    is used from a different loop (e.g. repeated asyncio.run). Each task
+    releases the semaphore it acquired, even if another loop has since
+    replaced it.
+    """
+    
+    def __init__(self, name: str, max_concurrency: int, rpm: int):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.rpm = rpm
+        self._sem: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._calls: Deque[float] = deque()
+        self._held: Dict[asyncio.Task, List[asyncio.Semaphore]] = {}
+    
+    async def __aenter__(self) -> "RateLimiter":
+        loop = asyncio.get_running_loop()
+        if self._sem is None or self._loop is not loop:
+            self._sem = asyncio.Semaphore(self.max_concurrency)
+            self._loop = loop
+        sem = self._sem
+        await sem.acquire()
+        try:
+            await self._wait_for_slot()
+        except BaseException:
+            sem.release()
+            raise
+        self._held.setdefault(asyncio.current_task(), []).append(sem)
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        task = asyncio.current_task()
+        held = self._held[task]
+        sem = held.pop()
+        if not held:
+            del self._held[task]
+        sem.release()
+    
+    async def _wait_for_slot(self) -> None:
+        """Wait until a call fits in the per-minute window, then record it."""
+        while True:
+            now = time.monotonic()
+            while self._calls and now - self._calls[0] >= RATE_WINDOW:
+                self._calls.popleft()
+            if len(self._calls) < self.rpm:
+                self._calls.append(now)
+                return
+            delay = RATE_WINDOW - (now - self._calls[0])
+            logger.debug("%s rate limit reached, waiting %.2fs", self.name, delay)
+            await asyncio.sleep(delay)
+
+serper_limiter = RateLimiter("Serper", SERPER_MAX_CONCURRENCY, SERPER_RPM)
+gemini_limiter = RateLimiter("Gemini", GEMINI_MAX_CONCURRENCY, GEMINI_RPM)
@@ -1,15 +1,22 @@
 import streamlit as st
 import json
 import os
+import re
+import atexit
+import html
 import asyncio
-from dotenv import load_dotenv
-import google.generativeai as genai
+import threading
+from string import Template
+from collections import OrderedDict, deque
 import logging
-import plotly.graph_objects as go
-from agents import run_clarity_agent, run_proof_agent
+import pandas as pd
+from agents import run_clarity_agent, run_clarity_agent_batch, run_proof_agent, stream_proof_agent, close_session
+from agents.agent_proof import warm_up as warm_up_serper
+from agents.gemini import configure_from_env, get_model
+from claim_graph import ClaimGraphStore
 
-# Load environment variables
-load_dotenv()
+# The agents package loads .env once per process when it is imported
+SERPER_API_KEY = os.getenv("SERPER_API_KEY")
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -22,247 +29,468 @@ st.set_page_config(
     layout="wide"
 )
 
-# Custom CSS for terminal theme
-st.markdown("""
-<style>
-    /* Main theme colors */
-    :root {
-        --primary-color: #2ec4b6;
-        --bg-color: #f8f9fa;
-        --secondary-bg: #ffffff;
-        --text-color: #212529;
-        --text-secondary: #6c757d;
-    }
-    
-    /* Global styles */
-    .stApp {
-        background-color: var(--bg-color);
-        color: var(--text-color);
-        font-family: 'Inter', 'IBM Plex Sans', 'Segoe UI', sans-serif;
-    }
-    
-    /* Headers */
-    h1, h2, h3, h4, h5, h6 {
-        color: var(--text-color) !important;
-        font-weight: 600 !important;
-        margin-bottom: 1.5rem !important;
-        letter-spacing: -0.02em;
-        font-family: 'Inter', 'IBM Plex Sans', 'Segoe UI', sans-serif;
-    }
-    
-    /* Cards and containers */
-    .stCard {
-        background-color: var(--secondary-bg);
-        border-radius: 12px;
-        padding: 1.5rem;
-        border: 1px solid #dee2e6;
-        box-shadow: none;
-        transition: box-shadow 0.3s ease;
-        font-family: 'Inter', 'IBM Plex Sans', 'Segoe UI', sans-serif;
-        margin-bottom: 1.5rem;
-    }
-    
-    .stCard:hover {
-        box-shadow: 0 2px 6px rgba(0,0,0,0.05);
-    }
-    
-    /* Buttons */
-    .stButton>button {
-        background-color: white;
-        border: 1px solid #ced4da;
-        color: #212529;
-        border-radius: 8px;
-        padding: 0.5rem 1rem;
-        transition: background-color 0.2s ease;
-        font-family: 'Inter', 'IBM Plex Sans', 'Segoe UI', sans-serif;
-        font-weight: 500;
-    }
-    
-    .stButton>button:hover {
-        background-color: #e9ecef;
-    }
-    
-    /* Input fields */
-    .stTextInput>div>div>input,
-    .stTextArea>div>div>textarea {
-        background-color: var(--secondary-bg);
-        color: var(--text-color);
-        border: 1px solid #dee2e6;
-        border-radius: 8px;
-        padding: 0.75rem;
-        font-family: 'Inter', 'IBM Plex Sans', 'Segoe UI', sans-serif;
-    }
-    
-    /* Tabs */
-    .stTabs [data-baseweb="tab-list"] {
-        gap: 2rem;
-        border-bottom: 1px solid #dee2e6;
-        margin-bottom: 2rem;
-    }
-    
-    .stTabs [data-baseweb="tab"] {
-        height: 50px;
-        white-space: pre-wrap;
-        background-color: var(--secondary-bg);
-        border-radius: 8px 8px 0 0;
-        gap: 1rem;
-        padding: 10px 20px;
-        color: var(--text-color);
-        font-weight: 500;
-    }
-    
-    .stTabs [aria-selected="true"] {
-        background-color: var(--primary-color);
-        color: var(--secondary-bg);
-    }
-    
-    /* Loading animation */
-    .stSpinner>div {
-        border-color: var(--primary-color);
-    }
-    
-    /* Evidence cards */
-    .evidence-card {
-        background-color: var(--secondary-bg);
-        border-radius: 12px;
-        padding: 1.25rem;
-        margin: 1rem 0;
-        border: 1px solid #dee2e6;
-        transition: box-shadow 0.3s ease;
-    }
-    
-    .evidence-card:hover {
-        box-shadow: 0 2px 6px rgba(0,0,0,0.05);
-    }
-    
-    /* Status badges */
-    .status-badge {
-        padding: 0.4em 0.9em;
-        border-radius: 1em;
-        font-size: 0.9em;
-        font-weight: 500;
-        color: #fff;
-    }
-    
-    .status-verified { background-color: #198754; }
-    .status-partial { background-color: #ffc107; color: #212529; }
-    .status-unclear { background-color: #6c757d; }
+# Terminal theme stylesheet, injected at the top of every run
+THEME_CSS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets", "theme.css")
+
+# Claim graph snapshot shared by all sessions
+CLAIM_GRAPH_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "graph.json")
+
+# Analyses kept in the session history; older entries are dropped
+HISTORY_MAX_ENTRIES = 50
+
+# Agent results kept per session, so resubmitting a claim skips the agents
+CLAIM_CACHE_SIZE = 64
+
+# Seconds a complete two-agent analysis is shared across reruns and sessions
+ANALYSIS_CACHE_TTL = 3600
+
+# Card markup, parsed once; callers substitute HTML-escaped values
+COMPONENT_CARD_TPL = Template('<div class="evidence-card"><h4>$type</h4><p>$text</p></div>')
+EVIDENCE_CARD_TPL = Template(
+    '<div class="evidence-card"><h4>$title</h4><p>$snippet</p><small>Source: $source</small></div>'
+)
+
+# Session history table layout, newest analysis first
+HISTORY_COLUMNS = ("claim", "clarity_score", "verdict", "confidence", "timestamp")
+HISTORY_COLUMN_CONFIG = {
+    "claim": st.column_config.TextColumn("Claim", width="large"),
+    "clarity_score": st.column_config.NumberColumn("Clarity", format="%.2f"),
+    "verdict": st.column_config.TextColumn("Verdict"),
+    "confidence": st.column_config.ProgressColumn("Confidence", format="%.2f", min_value=0.0, max_value=1.0),
+    "timestamp": st.column_config.TextColumn("Analyzed"),
+}
+
+# Fragments rerun only their own subtree on widget changes. st.fragment is
+# Streamlit >= 1.37 (st.experimental_fragment from 1.33); older releases rerun
+# the whole script as before.
+fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None) or (lambda func: func)
+
+# Initialize session state
+if 'analysis_results' not in st.session_state:
+    st.session_state.analysis_results = None
+if 'history' not in st.session_state:
+    st.session_state.history = deque(maxlen=HISTORY_MAX_ENTRIES)
+if 'gauge_html' not in st.session_state:
+    st.session_state.gauge_html = None
+if 'claim_cache' not in st.session_state:
+    st.session_state.claim_cache = OrderedDict()
+
+@st.cache_data
+def load_css() -> str:
+    """Read the theme stylesheet once, minified and wrapped for st.markdown.
     
-    /* Links */
-    a {
-        color: var(--primary-color);
-        text-decoration: none;
-    }
+    Streamlit drops elements a rerun doesn't emit, so the style block is sent
+    on every run; minifying keeps that payload small.
+    """
+    with open(THEME_CSS_PATH, encoding="utf-8") as f:
+        css = f.read()
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};])\s*", r"\1", css).strip()
+    return f"<style>{css}</style>"
+
+@st.cache_resource
+def _background_loop() -> asyncio.AbstractEventLoop:
+    """Start one event loop on a daemon thread, kept for the life of the server.
     
-    a:hover {
-        text-decoration: underline;
+    Reusing it across clicks keeps the agents' HTTP sessions and rate limiters
+    alive instead of rebuilding them with a fresh loop every time. All sessions
+    share the proof agent's pooled aiohttp session and the Gemini/Serper limits.
+    """
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name="agent-loop", daemon=True).start()
+    atexit.register(_close_background_loop, loop)
+    return loop
+
+def _close_background_loop(loop: asyncio.AbstractEventLoop):
+    """Close the shared HTTP session on the loop that owns it at server shutdown"""
+    try:
+        asyncio.run_coroutine_threadsafe(close_session(), loop).result(timeout=5)
+    except Exception as e:
+        logger.warning(f"Error closing HTTP session: {str(e)}")
+    loop.call_soon_threadsafe(loop.stop)
+
+@st.cache_resource
+def get_claim_graph() -> ClaimGraphStore:
+    """Load the claim graph snapshot once per server, shared by all sessions"""
+    store = ClaimGraphStore(CLAIM_GRAPH_PATH)
+    # Pending changes would otherwise be lost with the snapshot timer thread
+    atexit.register(store.flush)
+    return store
+
+def graph_claim(clarity_result, proof_result) -> dict:
+    """Describe a complete analysis as a claim graph node"""
+    claim = clarity_result['original_claim']
+    parts = {
+        str(component.get('type', '')).lower(): component.get('text', '')
+        for component in clarity_result.get('components', [])
+        if isinstance(component, dict)
     }
-    
-    /* Title */
-    .title {
-        font-size: 2.2em;
-        font-weight: 600;
-        color: var(--text-color);
-        margin-bottom: 0.5em;
-        letter-spacing: -0.02em;
+    return {
+        "id": claim.strip().lower(),
+        "claim_text": claim,
+        "subject": parts.get('subject', ''),
+        "predicate": parts.get('predicate', ''),
+        "object": parts.get('object', ''),
+        "confidence": proof_result['confidence'],
+        "status": proof_result['verdict'],
+        "created_at": proof_result['timestamp']
     }
+
+async def _warm_up_agents():
+    """Build the agents' Gemini model and open the Serper connection pool"""
+    if configure_from_env():
+        await asyncio.to_thread(get_model)
+    if SERPER_API_KEY:
+        await warm_up_serper()
+
+@st.cache_resource
+def _start_warm_up():
+    """Warm the agents once per server process, without blocking the first page"""
+    # Runs on the background loop so the warmed aiohttp session is the one reused
+    return asyncio.run_coroutine_threadsafe(_warm_up_agents(), _background_loop())
+
+def run_async(coro):
+    """Run a coroutine on the background loop and wait for its result"""
+    return asyncio.run_coroutine_threadsafe(coro, _background_loop()).result()
+
+def iter_async(agen):
+    """Iterate an async generator on the background loop, one item at a time"""
+    try:
+        while True:
+            yield run_async(agen.__anext__())
+    except StopAsyncIteration:
+        return
+    finally:
+        # Close the generator on its loop if the caller stops early
+        run_async(agen.aclose())
+
+def get_cached_result(agent: str, claim: str):
+    """Return an agent's earlier result for this claim in the session, if any"""
+    key = (agent, claim.strip().lower())
+    result = st.session_state.claim_cache.get(key)
+    if result is not None:
+        st.session_state.claim_cache.move_to_end(key)
+    return result
+
+def _result_failed(agent: str, result) -> bool:
+    """Check for an agent's fallback result, which is never cached"""
+    if not result:
+        return True
+    if agent == "clarity":
+        return any(
+            component.get("type") == "error"
+            for component in result.get("components", [])
+        )
+    return bool(result.get("error"))
+
+def cache_result(agent: str, claim: str, result: dict):
+    """Remember an agent's result for this claim, evicting the least recently used"""
+    if _result_failed(agent, result):
+        return
+    cache = st.session_state.claim_cache
+    cache[(agent, claim.strip().lower())] = result
+    if len(cache) > CLAIM_CACHE_SIZE:
+        cache.popitem(last=False)
+
+class IncompleteAnalysis(Exception):
+    """Raised from analyze_claim_cached so partial or failed results aren't cached"""
     
-    /* Section titles */
-    .section-title {
-        font-size: 1.4em;
-        font-weight: 600;
-        margin-top: 2.5em;
-        margin-bottom: 1.5em;
-        color: var(--text-color);
-        border-bottom: 1px solid #dee2e6;
-        padding-bottom: 0.5em;
+    def __init__(self, results):
+        super().__init__("Claim analysis incomplete")
+        self.results = results
+
+def _analysis_complete(results) -> bool:
+    """Check that both agents produced a real result rather than a fallback;
+    a genuine UNVERIFIED verdict counts, so it is memoized like any other"""
+    if not results:
+        return False
+    return not any(_result_failed(name, results[name]) for name in ("clarity", "proof"))
+
+@st.cache_data(ttl=ANALYSIS_CACHE_TTL, show_spinner=False)
+def analyze_claim_cached(claim: str) -> dict:
+    """Run both agents on a claim, memoized across reruns and sessions"""
+    results = run_async(analyze_claim(claim))
+    if not _analysis_complete(results):
+        raise IncompleteAnalysis(results)
+    return results
+
+def run_full_analysis(claim: str):
+    """Analyze a claim with both agents, serving repeated claims from the cache"""
+    try:
+        results = analyze_claim_cached(claim.strip())
+    except IncompleteAnalysis as e:
+        results = e.results
+    for name, result in (results or {}).items():
+        cache_result(name, claim, result)
+    return results
+
+def store_full_analysis(results):
+    """Make a full analysis the current one, for the Proof and Results tabs"""
+    st.session_state.analysis_results = {
+        name: result for name, result in results.items() if result
     }
-</style>
-""", unsafe_allow_html=True)
+    if results["proof"]:
+        store_confidence_gauge(results["proof"]["confidence"])
+        if results["clarity"]:
+            get_claim_graph().add_claims([graph_claim(results["clarity"], results["proof"])])
 
-# Initialize session state
-if 'analysis_results' not in st.session_state:
-    st.session_state.analysis_results = None
-if 'history' not in st.session_state:
-    st.session_state.history = []
+async def reverify_claims(claims):
+    """Analyze several claims with both agents in batched calls"""
+    # One Gemini call covers every clarity analysis; the concurrent proof
+    # calls are coalesced by the proof agent's batcher
+    clarity_results, *proof_results = await asyncio.gather(
+        run_clarity_agent_batch(claims),
+        *(run_proof_agent(claim, SERPER_API_KEY) for claim in claims),
+        return_exceptions=True
+    )
+    
+    if isinstance(clarity_results, Exception):
+        logger.error(f"Error in batch clarity analysis: {str(clarity_results)}")
+        clarity_results = [None] * len(claims)
+    analyses = []
+    for claim, clarity_result, proof_result in zip(claims, clarity_results, proof_results):
+        if isinstance(proof_result, Exception):
+            logger.error(f"Error in proof verification for {claim!r}: {str(proof_result)}")
+            proof_result = None
+        analyses.append({
+            "clarity": clarity_result,
+            "proof": proof_result
+        })
+    return analyses
 
 def init_gemini():
     """Initialize Gemini API"""
-    api_key = os.getenv("GEMINI_API_KEY")
-    if not api_key:
+    if not configure_from_env():
         st.error("Please set GEMINI_API_KEY in your .env file")
         return None
-    genai.configure(api_key=api_key)
-    return genai.GenerativeModel('models/gemini-1.5-flash-latest')
+    return get_model()
 
 async def analyze_claim(claim: str):
     """Analyze a claim using both agents"""
-    try:
-        # Run clarity agent
-        clarity_result = await run_clarity_agent(claim)
-        
-        # Run proof agent
-        proof_result = await run_proof_agent(claim, os.getenv("SERPER_API_KEY"))
-        
-        return {
-            "clarity": clarity_result,
-            "proof": proof_result
-        }
-    except Exception as e:
-        logger.error(f"Error analyzing claim: {str(e)}")
+    # Run the clarity and proof agents concurrently; they are independent,
+    # so one failing still leaves the other's result
+    clarity_result, proof_result = await asyncio.gather(
+        run_clarity_agent(claim),
+        run_proof_agent(claim, SERPER_API_KEY),
+        return_exceptions=True
+    )
+    
+    if isinstance(clarity_result, Exception):
+        logger.error(f"Error in clarity analysis: {str(clarity_result)}")
+        clarity_result = None
+    if isinstance(proof_result, Exception):
+        logger.error(f"Error in proof verification: {str(proof_result)}")
+        proof_result = None
+    if clarity_result is None and proof_result is None:
         return None
-
-def create_confidence_gauge(confidence: float):
-    """Create a confidence gauge using Plotly"""
-    fig = go.Figure(go.Indicator(
-        mode="gauge+number",
-        value=confidence * 100,
-        domain={'x': [0, 1], 'y': [0, 1]},
-        gauge={
-            'axis': {'range': [0, 100]},
-            'bar': {'color': "#2ec4b6"},
-            'steps': [
-                {'range': [0, 33], 'color': "#f0f0f0"},
-                {'range': [33, 66], 'color': "#dee2e6"},
-                {'range': [66, 100], 'color': "#b2f0e3"}
-            ],
-            'threshold': {
-                'line': {'color': "#2ec4b6", 'width': 2},
-                'thickness': 0.75,
-                'value': confidence * 100
-            }
-        },
-        title={'text': "Confidence Level", 'font': {'color': "#212529"}}
-    ))
     
-    fig.update_layout(
-        paper_bgcolor="rgba(0,0,0,0)",
-        plot_bgcolor="rgba(0,0,0,0)",
-        font={'color': "#212529"},
-        height=200,
-        margin=dict(t=30, b=0, l=0, r=0)
+    return {
+        "clarity": clarity_result,
+        "proof": proof_result
+    }
+
+@st.cache_data(max_entries=128)
+def confidence_meter(confidence: float) -> str:
+    """Build a semicircular confidence meter as inline SVG, memoized per value"""
+    pct = max(0.0, min(100.0, confidence * 100))
+    # pathLength="100" lets the dash length be the percentage itself
+    arc = "M 10 50 A 40 40 0 0 1 90 50"
+    return f"""
+<div style="text-align:center">
+<div style="font-weight:500;color:#212529">Confidence Level</div>
+<svg viewBox="0 0 100 58" style="width:100%;max-width:260px" role="img" aria-label="Confidence {pct:.0f}%">
+<path d="{arc}" fill="none" stroke="#dee2e6" stroke-width="8" pathLength="100"/>
+<path d="{arc}" fill="none" stroke="#2ec4b6" stroke-width="8" pathLength="100" stroke-dasharray="{pct:.1f} 100"/>
+<text x="50" y="48" text-anchor="middle" font-size="14" font-weight="600" fill="#212529">{pct:.0f}</text>
+</svg>
+</div>
+"""
+
+def render_evidence_cards(evidence_items) -> str:
+    """Build the HTML for a list of evidence cards"""
+    return "".join(
+        EVIDENCE_CARD_TPL.substitute(
+            title=html.escape(str(evidence['title'])),
+            snippet=html.escape(str(evidence['snippet'])),
+            source=html.escape(str(evidence['source']))
+        )
+        for evidence in evidence_items
+    )
+
+@st.cache_data(max_entries=8)
+def history_table(rows: tuple) -> pd.DataFrame:
+    """Build the history table, memoized on the history's contents"""
+    return pd.DataFrame(list(rows), columns=list(HISTORY_COLUMNS))
+
+def show_history():
+    """Render the session history as a single table, newest first"""
+    rows = tuple(
+        tuple(item[column] for column in HISTORY_COLUMNS)
+        for item in reversed(st.session_state.history)
+    )
+    st.dataframe(
+        history_table(rows),
+        use_container_width=True,
+        hide_index=True,
+        column_config=HISTORY_COLUMN_CONFIG
     )
-    
-    return fig
+
+def history_entry(clarity_result, proof_result) -> dict:
+    """Summarize a complete analysis as a history row"""
+    return {
+        "claim": clarity_result['original_claim'],
+        "clarity_score": clarity_result['clarity_score'],
+        "verdict": proof_result['verdict'],
+        "confidence": proof_result['confidence'],
+        "timestamp": proof_result['timestamp']
+    }
+
+def reverify_history():
+    """Re-verify selected history claims together, in one batched pass"""
+    claims = list(dict.fromkeys(item['claim'] for item in reversed(st.session_state.history)))
+    selected = st.multiselect("Claims to re-verify:", claims, key="reverify_claims")
+    if st.button("Re-verify selected", key="reverify_btn", disabled=not selected):
+        with st.spinner(f"Re-verifying {len(selected)} claim(s)..."):
+            analyses = run_async(reverify_claims(selected))
+        graph_claims = []
+        for claim, results in zip(selected, analyses):
+            for name, result in results.items():
+                cache_result(name, claim, result)
+            if results["clarity"] and results["proof"]:
+                st.session_state.history.append(history_entry(results["clarity"], results["proof"]))
+                graph_claims.append(graph_claim(results["clarity"], results["proof"]))
+        if graph_claims:
+            get_claim_graph().add_claims(graph_claims)
+        verified = len(graph_claims)
+        if verified == len(selected):
+            st.success(f"Re-verified {verified} claim(s).")
+        else:
+            st.warning(f"Re-verified {verified} of {len(selected)} claim(s); the rest failed.")
+
+def store_confidence_gauge(confidence: float):
+    """Build the gauge once when a verification completes, for every tab to reuse"""
+    st.session_state.gauge_html = confidence_meter(round(confidence, 2))
+
+def show_confidence_gauge():
+    """Render the stored gauge"""
+    st.markdown(st.session_state.gauge_html, unsafe_allow_html=True)
 
 def display_claim_components(components):
     """Display claim components in a structured way"""
     st.markdown("<div class='section-title'>Claim Components</div>", unsafe_allow_html=True)
     
-    for component in components:
-        with st.container():
+    # One markdown call for all cards, rather than one websocket message each
+    cards = "".join(
+        COMPONENT_CARD_TPL.substitute(
+            type=html.escape(str(component['type'])),
+            text=html.escape(str(component['text']))
+        )
+        for component in components
+    )
+    st.markdown(cards, unsafe_allow_html=True)
+
+def display_clarity_result(result):
+    """Display the clarity agent's components, score and suggestions"""
+    # Display components
+    if "components" in result:
+        display_claim_components(result["components"])
+    
+    # Display clarity score
+    if "clarity_score" in result:
+        st.markdown(f"### Clarity Score: {result['clarity_score']:.2f}")
+        st.progress(result['clarity_score'])
+        
+        # Add suggestions if clarity score is low
+        if result['clarity_score'] < 0.6 and "suggestions" in result:
+            st.markdown("### Suggestions for Improvement")
+            st.markdown("\n".join(f"- {suggestion}" for suggestion in result['suggestions']))
+
+@fragment
+def render_proof_result(result):
+    """Display a verification's gauge, verdict and evidence"""
+    # Display confidence gauge
+    show_confidence_gauge()
+    
+    # Display verdict
+    st.markdown(f"""
+    <div class="stCard">
+        <h3>Verdict: {result['verdict']}</h3>
+        <p>{result['explanation']}</p>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    # Display evidence
+    if result["evidence"]:
+        st.markdown("<div class='section-title'>Evidence</div>", unsafe_allow_html=True)
+        st.markdown(render_evidence_cards(result["evidence"]), unsafe_allow_html=True)
+
+@fragment
+def render_results_summary():
+    """Display the current analysis summary and the session history"""
+    if st.session_state.analysis_results:
+        clarity_result = st.session_state.analysis_results.get("clarity")
+        proof_result = st.session_state.analysis_results.get("proof")
+        
+        if clarity_result and proof_result:
+            # Display summary
+            st.markdown("""
+            <div class="stCard">
+                <h2>Analysis Summary</h2>
+            </div>
+            """, unsafe_allow_html=True)
+            
+            # Clarity results
+            st.markdown("<div class='section-title'>Clarity Analysis</div>", unsafe_allow_html=True)
+            st.markdown(f"""
+            <div class="evidence-card">
+                <h4>Original Claim</h4>
+                <p>{clarity_result['original_claim']}</p>
+                <h4>Clarity Score</h4>
+                <p>{clarity_result['clarity_score']:.2f}</p>
+            </div>
+            """, unsafe_allow_html=True)
+            
+            # Proof results
+            st.markdown("<div class='section-title'>Verification Results</div>", unsafe_allow_html=True)
+            if st.session_state.gauge_html is None:
+                store_confidence_gauge(proof_result["confidence"])
+            show_confidence_gauge()
+            
             st.markdown(f"""
             <div class="evidence-card">
-                <h4>{component['type']}</h4>
-                <p>{component['text']}</p>
+                <h4>Verdict</h4>
+                <p>{proof_result['verdict']}</p>
+                <h4>Explanation</h4>
+                <p>{proof_result['explanation']}</p>
             </div>
             """, unsafe_allow_html=True)
+            
+            # Add to history, once per analysis rather than once per rerun
+            entry = history_entry(clarity_result, proof_result)
+            if entry not in st.session_state.history:
+                st.session_state.history.append(entry)
+            
+            # Display history
+            if st.session_state.history:
+                st.markdown("<div class='section-title'>Analysis History</div>", unsafe_allow_html=True)
+                reverify_history()
+                show_history()
+        else:
+            st.info("Please analyze a claim first using the Clarity and Proof agents.")
+    else:
+        st.info("No analysis results available. Please use the Clarity and Proof agents to analyze a claim.")
 
 def main():
     """Main application function"""
+    st.markdown(load_css(), unsafe_allow_html=True)
+    _start_warm_up()
     st.markdown("<div class='title'>RealityPatch Terminal</div>", unsafe_allow_html=True)
     st.caption("AI-powered claim verification and analysis")
     
+    # Configure Gemini for the agents; cached, so reruns skip the setup
+    init_gemini()
+    
     # Create tabs
     tab1, tab2, tab3, tab4 = st.tabs(["Home", "Clarity Agent", "Proof Agent", "Results & Summary"])
     
@@ -299,25 +527,51 @@ def main():
         
         for claim in example_claims:
             if st.button(claim, key=f"example_{claim[:10]}"):
-                st.session_state.analysis_results = None
-                st.session_state.history = []
-                st.switch_page("Clarity Agent")
+                with st.spinner("Analyzing and verifying claim..."):
+                    results = run_full_analysis(claim)
+                if results:
+                    store_full_analysis(results)
+                    st.success("Analysis complete! See Results & Summary for the verdict.")
+                else:
+                    st.error("Failed to analyze claim. Please try again.")
     
     with tab2:
         st.markdown("<div class='section-title'>Clarity Agent</div>", unsafe_allow_html=True)
         st.markdown("Enter a claim to analyze its clarity and structure.")
         
-        claim = st.text_area(
-            "Enter your claim:",
-            height=100,
-            key="clarity_claim_input",
-            placeholder="e.g., The moon landing was faked in 1969.",
-            help="Enter a clear, specific claim that you want to verify."
-        )
+        # A form, so editing the claim doesn't rerun the script until it is submitted
+        with st.form("clarity_form", border=False):
+            claim = st.text_area(
+                "Enter your claim:",
+                height=100,
+                key="clarity_claim_input",
+                placeholder="e.g., The moon landing was faked in 1969.",
+                help="Enter a clear, specific claim that you want to verify."
+            )
+            
+            col1, col2, col3 = st.columns([1, 1, 3])
+            with col1:
+                analyze_btn = st.form_submit_button("Analyze Clarity", use_container_width=True)
+            with col2:
+                full_btn = st.form_submit_button("Full Analysis", use_container_width=True)
         
-        col1, col2 = st.columns([1, 4])
-        with col1:
-            analyze_btn = st.button("Analyze Clarity", key="clarity_analyze_btn", use_container_width=True)
+        if full_btn:
+            if not claim:
+                st.warning("Please enter a claim to analyze.")
+            else:
+                with st.spinner("Analyzing and verifying claim..."):
+                    # Both agents run concurrently on the background loop
+                    results = run_full_analysis(claim)
+                if results:
+                    store_full_analysis(results)
+                    if results["clarity"]:
+                        display_clarity_result(results["clarity"])
+                    if results["proof"]:
+                        st.success("Analysis complete! See Results & Summary for the verdict.")
+                    else:
+                        st.warning("Clarity analysis complete, but verification failed.")
+                else:
+                    st.error("Failed to analyze claim. Please try again.")
         
         if analyze_btn:
             if not claim:
@@ -325,25 +579,14 @@ def main():
             else:
                 with st.spinner("Analyzing claim clarity..."):
                     try:
-                        result = asyncio.run(run_clarity_agent(claim))
+                        result = get_cached_result("clarity", claim)
+                        if result is None:
+                            result = run_async(run_clarity_agent(claim))
+                            cache_result("clarity", claim, result)
                         if result:
                             st.session_state.analysis_results = {"clarity": result}
                             st.success("Analysis complete!")
-                            
-                            # Display components
-                            if "components" in result:
-                                display_claim_components(result["components"])
-                            
-                            # Display clarity score
-                            if "clarity_score" in result:
-                                st.markdown(f"### Clarity Score: {result['clarity_score']:.2f}")
-                                st.progress(result['clarity_score'])
-                                
-                                # Add suggestions if clarity score is low
-                                if result['clarity_score'] < 0.6 and "suggestions" in result:
-                                    st.markdown("### Suggestions for Improvement")
-                                    for suggestion in result['suggestions']:
-                                        st.markdown(f"- {suggestion}")
+                            display_clarity_result(result)
                         else:
                             st.error("Failed to analyze claim. Please try again.")
                     except Exception as e:
@@ -354,21 +597,22 @@ def main():
         st.markdown("<div class='section-title'>Proof Agent</div>", unsafe_allow_html=True)
         st.markdown("Verify your claim with evidence and analysis.")
         
-        if st.session_state.analysis_results and "clarity" in st.session_state.analysis_results:
-            claim = st.session_state.analysis_results["clarity"].get("original_claim", "")
-            st.info("Using claim from Clarity Agent analysis.")
-        else:
-            claim = st.text_area(
-                "Enter your claim:",
-                height=100,
-                key="proof_claim_input",
-                placeholder="e.g., The moon landing was faked in 1969.",
-                help="Enter a claim to verify with evidence."
-            )
-        
-        col1, col2 = st.columns([1, 4])
-        with col1:
-            verify_btn = st.button("Verify Claim", key="proof_verify_btn", use_container_width=True)
+        with st.form("proof_form", border=False):
+            if st.session_state.analysis_results and "clarity" in st.session_state.analysis_results:
+                claim = st.session_state.analysis_results["clarity"].get("original_claim", "")
+                st.info("Using claim from Clarity Agent analysis.")
+            else:
+                claim = st.text_area(
+                    "Enter your claim:",
+                    height=100,
+                    key="proof_claim_input",
+                    placeholder="e.g., The moon landing was faked in 1969.",
+                    help="Enter a claim to verify with evidence."
+                )
+            
+            col1, col2 = st.columns([1, 4])
+            with col1:
+                verify_btn = st.form_submit_button("Verify Claim", use_container_width=True)
         
         if verify_btn:
             if not claim:
@@ -376,36 +620,28 @@ def main():
             else:
                 with st.spinner("Verifying claim..."):
                     try:
-                        result = asyncio.run(run_proof_agent(claim, os.getenv("SERPER_API_KEY")))
+                        result = get_cached_result("proof", claim)
+                        if result is None:
+                            # Show the evidence while Gemini is still ruling on it
+                            progress = st.empty()
+                            for result in iter_async(stream_proof_agent(claim, SERPER_API_KEY)):
+                                if result.get("partial") and result["evidence"]:
+                                    progress.markdown(
+                                        "<div class='section-title'>Evidence (verifying...)</div>"
+                                        + render_evidence_cards(result["evidence"]),
+                                        unsafe_allow_html=True
+                                    )
+                            progress.empty()
+                            cache_result("proof", claim, result)
                         if result:
                             if st.session_state.analysis_results:
                                 st.session_state.analysis_results["proof"] = result
                             else:
                                 st.session_state.analysis_results = {"proof": result}
+                            store_confidence_gauge(result["confidence"])
                             st.success("Verification complete!")
                             
-                            # Display confidence gauge
-                            st.plotly_chart(create_confidence_gauge(result["confidence"]))
-                            
-                            # Display verdict
-                            st.markdown(f"""
-                            <div class="stCard">
-                                <h3>Verdict: {result['verdict']}</h3>
-                                <p>{result['explanation']}</p>
-                            </div>
-                            """, unsafe_allow_html=True)
-                            
-                            # Display evidence
-                            if result["evidence"]:
-                                st.markdown("<div class='section-title'>Evidence</div>", unsafe_allow_html=True)
-                                for evidence in result["evidence"]:
-                                    st.markdown(f"""
-                                    <div class="evidence-card">
-                                        <h4>{evidence['title']}</h4>
-                                        <p>{evidence['snippet']}</p>
-                                        <small>Source: {evidence['source']}</small>
-                                    </div>
-                                    """, unsafe_allow_html=True)
+                            render_proof_result(result)
                         else:
                             st.error("Failed to verify claim. Please try again.")
                     except Exception as e:
@@ -415,67 +651,7 @@ def main():
     with tab4:
         st.markdown("<div class='section-title'>Results & Summary</div>", unsafe_allow_html=True)
         
-        if st.session_state.analysis_results:
-            clarity_result = st.session_state.analysis_results.get("clarity")
-            proof_result = st.session_state.analysis_results.get("proof")
-            
-            if clarity_result and proof_result:
-                # Display summary
-                st.markdown("""
-                <div class="stCard">
-                    <h2>Analysis Summary</h2>
-                </div>
-                """, unsafe_allow_html=True)
-                
-                # Clarity results
-                st.markdown("<div class='section-title'>Clarity Analysis</div>", unsafe_allow_html=True)
-                st.markdown(f"""
-                <div class="evidence-card">
-                    <h4>Original Claim</h4>
-                    <p>{clarity_result['original_claim']}</p>
-                    <h4>Clarity Score</h4>
-                    <p>{clarity_result['clarity_score']:.2f}</p>
-                </div>
-                """, unsafe_allow_html=True)
-                
-                # Proof results
-                st.markdown("<div class='section-title'>Verification Results</div>", unsafe_allow_html=True)
-                st.plotly_chart(create_confidence_gauge(proof_result["confidence"]))
-                
-                st.markdown(f"""
-                <div class="evidence-card">
-                    <h4>Verdict</h4>
-                    <p>{proof_result['verdict']}</p>
-                    <h4>Explanation</h4>
-                    <p>{proof_result['explanation']}</p>
-                </div>
-                """, unsafe_allow_html=True)
-                
-                # Add to history
-                st.session_state.history.append({
-                    "claim": clarity_result['original_claim'],
-                    "clarity_score": clarity_result['clarity_score'],
-                    "verdict": proof_result['verdict'],
-                    "confidence": proof_result['confidence'],
-                    "timestamp": proof_result['timestamp']
-                })
-                
-                # Display history
-                if st.session_state.history:
-                    st.markdown("<div class='section-title'>Analysis History</div>", unsafe_allow_html=True)
-                    for item in reversed(st.session_state.history):
-                        st.markdown(f"""
-                        <div class="evidence-card">
-                            <h4>{item['claim']}</h4>
-                            <p>Verdict: {item['verdict']}</p>
-                            <p>Confidence: {item['confidence']:.2%}</p>
-                            <small>Analyzed: {item['timestamp']}</small>
-                        </div>
-                        """, unsafe_allow_html=True)
-            else:
-                st.info("Please analyze a claim first using the Clarity and Proof agents.")
-        else:
-            st.info("No analysis results available. Please use the Clarity and Proof agents to analyze a claim.")
+        render_results_summary()
 
 if __name__ == "__main__":
     main() 
@@ -1,91 +1,180 @@
+import os
+import logging
+import threading
 import networkx as nx
-from typing import List, Dict, Any
-import json
+from typing import List, Dict, Any, Optional, Tuple
+import orjson
 from datetime import datetime
 import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+
+logger = logging.getLogger(__name__)
+
+# scipy and scikit-learn are imported on first use: scikit-learn alone takes
+# most of a second to import, and most callers never add a claim
+
+HASHING_FEATURES = 2**18  # Hashed vocabulary size for claim texts
+SIMILARITY_THRESHOLD = 0.3  # Cosine similarity above which claims are linked
+CENTRALITY_SAMPLES = 50  # Source nodes sampled for approximate betweenness
+SNAPSHOT_DELAY = 5.0  # Seconds without changes before a store writes its snapshot
 
 class ClaimGraph:
     def __init__(self):
         self.graph = nx.Graph()
-        self.vectorizer = TfidfVectorizer(stop_words='english')
+        self._vectorizer = None
+        # Sparse matrix with one row per node's claim text, in _node_order
+        self._text_matrix = None
+        self._node_order: List[str] = []
+        self._node_rows: Dict[str, int] = {}
+        # Bumped on every change, so to_json can reuse its last result
+        self._dirty = 0
+        self._json_cache: Optional[Tuple[int, str]] = None
+    
+    @staticmethod
+    def _node_attributes(claim: Dict[str, Any]) -> Dict[str, Any]:
+        """Node attributes stored for a claim"""
+        return {
+            'type': 'claim',
+            'text': claim['claim_text'],
+            'subject': claim.get('subject', ''),
+            'predicate': claim.get('predicate', ''),
+            'object': claim.get('object', ''),
+            'confidence': claim.get('confidence', 0.0),
+            'status': claim.get('status', 'Unknown'),
+            'created_at': claim.get('created_at', datetime.now().isoformat())
+        }
+    
+    @staticmethod
+    def _query_text(claim: Dict[str, Any]) -> str:
+        """Text a new claim is compared with existing claims by"""
+        return f"{claim.get('subject', '')} {claim.get('predicate', '')} {claim.get('object', '')}"
     
     def add_claim(self, claim: Dict[str, Any]):
         """Add a claim to the graph"""
         claim_id = str(claim['id'])
         
         # Add claim node
-        self.graph.add_node(
-            claim_id,
-            type='claim',
-            text=claim['claim_text'],
-            subject=claim.get('subject', ''),
-            predicate=claim.get('predicate', ''),
-            object=claim.get('object', ''),
-            confidence=claim.get('confidence', 0.0),
-            status=claim.get('status', 'Unknown'),
-            created_at=claim.get('created_at', datetime.now().isoformat())
-        )
+        self.graph.add_node(claim_id, **self._node_attributes(claim))
         
         # Add edges to similar claims
         self._add_similarity_edges(claim_id, claim)
+        self._dirty += 1
     
-    def _add_similarity_edges(self, claim_id: str, claim: Dict[str, Any]):
-        """Add edges between similar claims based on content similarity"""
-        if len(self.graph.nodes) < 2:
+    def bulk_add(self, claims: List[Dict[str, Any]]):
+        """Add several claims, scoring all their similarities in two sparse products.
+        
+        Produces the same edges as calling add_claim for each claim in order.
+        """
+        if not claims:
+            return
+        ids = [str(claim['id']) for claim in claims]
+        if len(set(ids)) < len(ids) or any(claim_id in self.graph for claim_id in ids):
+            # Re-added claims re-index the graph; keep add_claim's handling
+            for claim in claims:
+                self.add_claim(claim)
             return
         
-        # Get text representation of the claim
-        claim_text = f"{claim.get('subject', '')} {claim.get('predicate', '')} {claim.get('object', '')}"
+        self.graph.add_nodes_from(
+            (claim_id, self._node_attributes(claim)) for claim_id, claim in zip(ids, claims)
+        )
+        queries = self.vectorizer.transform([self._query_text(claim) for claim in claims])
+        rows = self.vectorizer.transform([claim['claim_text'] for claim in claims])
         
-        # Get all existing claim texts
-        existing_claims = {
-            node: data['text']
-            for node, data in self.graph.nodes(data=True)
-            if node != claim_id
-        }
+        # Each new claim against every existing claim
+        if self._node_order:
+            scores = (queries @ self._text_matrix.T).tocoo()
+            for i, j, score in zip(scores.row, scores.col, scores.data):
+                if score > SIMILARITY_THRESHOLD:
+                    self.graph.add_edge(ids[i], self._node_order[j], weight=float(score), type='similarity')
+        
+        # Each new claim against the new claims added before it
+        scores = (queries @ rows.T).tocoo()
+        for i, j, score in zip(scores.row, scores.col, scores.data):
+            if j < i and score > SIMILARITY_THRESHOLD:
+                self.graph.add_edge(ids[i], ids[j], weight=float(score), type='similarity')
         
-        if not existing_claims:
+        if self._text_matrix is None:
+            self._text_matrix = rows
+        else:
+            import scipy.sparse as sp
+            self._text_matrix = sp.vstack([self._text_matrix, rows], format='csr')
+        for claim_id in ids:
+            self._node_rows[claim_id] = len(self._node_order)
+            self._node_order.append(claim_id)
+        self._dirty += 1
+    
+    @property
+    def vectorizer(self):
+        """Claim text vectorizer, created on first use"""
+        if self._vectorizer is None:
+            from sklearn.feature_extraction.text import HashingVectorizer
+            # Stateless, so new claims are vectorized without refitting on the corpus;
+            # rows are L2-normalized, making a dot product the cosine similarity
+            self._vectorizer = HashingVectorizer(
+                stop_words='english',
+                n_features=HASHING_FEATURES,
+                norm='l2',
+                alternate_sign=False
+            )
+        return self._vectorizer
+    
+    def _index_texts(self):
+        """Rebuild the claim-text matrix from every node in the graph"""
+        self._node_order = list(self.graph.nodes)
+        self._node_rows = {node: i for i, node in enumerate(self._node_order)}
+        self._text_matrix = self.vectorizer.transform(
+            [self.graph.nodes[node].get('text', '') for node in self._node_order]
+        )
+    
+    def _index_claim(self, claim_id: str):
+        """Add or refresh a node's row in the claim-text matrix"""
+        if claim_id in self._node_rows:
+            # Re-added claim whose text may have changed
+            self._index_texts()
+            return
+        row = self.vectorizer.transform([self.graph.nodes[claim_id]['text']])
+        if self._text_matrix is None:
+            self._text_matrix = row
+        else:
+            import scipy.sparse as sp
+            self._text_matrix = sp.vstack([self._text_matrix, row], format='csr')
+        self._node_rows[claim_id] = len(self._node_order)
+        self._node_order.append(claim_id)
+    
+    def _add_similarity_edges(self, claim_id: str, claim: Dict[str, Any]):
+        """Add edges between similar claims based on content similarity"""
+        self._index_claim(claim_id)
+        if len(self.graph.nodes) < 2:
             return
         
-        # Calculate similarity scores
-        texts = list(existing_claims.values()) + [claim_text]
-        tfidf_matrix = self.vectorizer.fit_transform(texts)
-        similarity_scores = cosine_similarity(tfidf_matrix[-1:], tfidf_matrix[:-1])[0]
+        # Cosine similarity against every indexed claim in one sparse product
+        query = self.vectorizer.transform([self._query_text(claim)])
+        similarity_scores = (self._text_matrix @ query.T).toarray().ravel()
+        similarity_scores[self._node_rows[claim_id]] = 0.0
         
         # Add edges for similar claims
-        for node, score in zip(existing_claims.keys(), similarity_scores):
-            if score > 0.3:  # Similarity threshold
-                self.graph.add_edge(
-                    claim_id,
-                    node,
-                    weight=score,
-                    type='similarity'
-                )
+        for i in np.flatnonzero(similarity_scores > SIMILARITY_THRESHOLD):
+            self.graph.add_edge(
+                claim_id,
+                self._node_order[i],
+                weight=float(similarity_scores[i]),
+                type='similarity'
+            )
     
     def get_connected_claims(self, claim_id: str, max_depth: int = 2) -> List[Dict[str, Any]]:
         """Get claims connected to a specific claim within max_depth"""
         if claim_id not in self.graph:
             return []
         
-        connected_nodes = set()
-        current_nodes = {claim_id}
-        
-        for _ in range(max_depth):
-            next_nodes = set()
-            for node in current_nodes:
-                neighbors = set(self.graph.neighbors(node))
-                next_nodes.update(neighbors)
-            connected_nodes.update(next_nodes)
-            current_nodes = next_nodes
+        # Hop distance to every node within max_depth, from a single BFS
+        depths = nx.single_source_shortest_path_length(self.graph, claim_id, cutoff=max_depth)
         
         return [
             {
                 'id': node,
                 **self.graph.nodes[node]
             }
-            for node in connected_nodes
+            for node, depth in depths.items()
+            if depth > 0
         ]
     
     def get_community_claims(self) -> List[List[str]]:
@@ -93,21 +182,15 @@ class ClaimGraph:
         if len(self.graph.nodes) < 2:
             return []
         
-        try:
-            import community
-            partition = community.best_partition(self.graph)
-            communities = {}
-            for node, community_id in partition.items():
-                if community_id not in communities:
-                    communities[community_id] = []
-                communities[community_id].append(node)
-            return list(communities.values())
-        except ImportError:
-            # Fallback to connected components if community detection is not available
-            return list(nx.connected_components(self.graph))
+        # Weighted by similarity, seeded so communities are stable between calls
+        communities = nx.community.louvain_communities(self.graph, weight='weight', seed=0)
+        return [list(community) for community in communities]
     
     def to_json(self) -> str:
         """Convert graph to JSON format for visualization"""
+        if self._json_cache is not None and self._json_cache[0] == self._dirty:
+            return self._json_cache[1]
+        
         graph_data = {
             'nodes': [
                 {
@@ -125,11 +208,13 @@ class ClaimGraph:
                 for source, target, data in self.graph.edges(data=True)
             ]
         }
-        return json.dumps(graph_data)
+        json_data = orjson.dumps(graph_data, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+        self._json_cache = (self._dirty, json_data)
+        return json_data
     
     def from_json(self, json_data: str):
         """Load graph from JSON format"""
-        data = json.loads(json_data)
+        data = orjson.loads(json_data)
         self.graph.clear()
         
         # Add nodes
@@ -142,14 +227,19 @@ class ClaimGraph:
             source = edge.pop('source')
             target = edge.pop('target')
             self.graph.add_edge(source, target, **edge)
+        
+        self._index_texts()
+        self._dirty += 1
     
     def get_central_claims(self, top_n: int = 5) -> List[Dict[str, Any]]:
         """Get the most central claims in the graph"""
         if len(self.graph.nodes) < 2:
             return []
         
-        # Calculate centrality scores
-        centrality = nx.betweenness_centrality(self.graph)
+        # Approximate betweenness from a fixed sample of source nodes;
+        # seeded so the ranking is stable between calls
+        k = min(CENTRALITY_SAMPLES, len(self.graph.nodes))
+        centrality = nx.betweenness_centrality(self.graph, k=k, seed=0)
         
         # Get top N central claims
         central_nodes = sorted(
@@ -165,4 +255,53 @@ class ClaimGraph:
                 **self.graph.nodes[node]
             }
             for node, score in central_nodes
-        ] 
\ No newline at end of file
+        ]
+
+class ClaimGraphStore:
+    """A ClaimGraph shared between threads and persisted to a JSON snapshot.
+    
+    The snapshot is loaded on creation and rewritten SNAPSHOT_DELAY seconds
+    after the last change, so a burst of additions costs one write.
+    """
+    
+    def __init__(self, path: str, delay: float = SNAPSHOT_DELAY):
+        self.path = path
+        self.delay = delay
+        self.graph = ClaimGraph()
+        self.lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        self._load()
+    
+    def _load(self):
+        """Load the snapshot, starting empty if it is missing or unreadable"""
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'rb') as f:
+                self.graph.from_json(f.read())
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning("Could not load claim graph snapshot %s: %s", self.path, e)
+            self.graph = ClaimGraph()
+    
+    def add_claims(self, claims: List[Dict[str, Any]]):
+        """Add claims to the graph and schedule a snapshot"""
+        with self.lock:
+            self.graph.bulk_add(claims)
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+    
+    def flush(self):
+        """Write the snapshot now, replacing the old file atomically"""
+        with self.lock:
+            self._timer = None
+            try:
+                os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+                tmp_path = f"{self.path}.tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    f.write(self.graph.to_json())
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                logger.error("Could not write claim graph snapshot %s: %s", self.path, e)
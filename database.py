@@ -1,17 +1,114 @@
+import time
+import queue
 import sqlite3
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 import json
-from typing import List, Dict, Any, Optional
+from typing import Iterator, List, Dict, Any, Optional, Tuple
 from config import Config
 
+POOL_SIZE = 4  # Long-lived connections shared by all threads
+SESSION_CACHE_SIZE = 4096  # Validated session tokens remembered in-process
+SESSION_CLEANUP_INTERVAL = 3600  # Seconds between sweeps of expired sessions
+
+# Applied once to each pooled connection
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",  # Readers don't block the writer
+    "PRAGMA synchronous=NORMAL",  # Safe with WAL; fsync at checkpoints only
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-64000",  # 64 MB page cache per connection
+    "PRAGMA mmap_size=2147483648",
+    "PRAGMA busy_timeout=5000",  # Milliseconds to wait on a locked database
+)
+
+# Statements run on every save, kept identical so SQLite reuses their compiled plans
+INSERT_CLAIM_SQL = """
+    INSERT INTO claims (
+        user_id, claim_text, subject, predicate, object,
+        status, confidence, explanation
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+INSERT_AGENT_RESULT_SQL = """
+    INSERT INTO agent_results (
+        claim_id, agent_name, confidence, explanation
+    ) VALUES (?, ?, ?, ?)
+"""
+
+class _ConnectionPool:
+    """A fixed set of SQLite connections, opened on demand and reused.
+    
+    Connections are created with check_same_thread=False so any thread can
+    borrow one; each is used by a single thread at a time.
+    """
+    
+    def __init__(self, db_path: str, size: int = POOL_SIZE):
+        self.db_path = db_path
+        self.size = size
+        self._idle: "queue.Queue[sqlite3.Connection]" = queue.Queue(maxsize=size)
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+    
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        # Rows support both index and column-name access, and dict(row)
+        conn.row_factory = sqlite3.Row
+        return conn
+    
+    def _acquire(self) -> sqlite3.Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if len(self._connections) < self.size:
+                conn = self._connect()
+                self._connections.append(conn)
+                return conn
+        return self._idle.get()
+    
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a connection; commits on success and rolls back on error"""
+        conn = self._acquire()
+        try:
+            with conn:
+                yield conn
+        finally:
+            self._idle.put(conn)
+    
+    def close(self):
+        """Close every connection the pool has opened"""
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+            self._idle = queue.Queue(maxsize=self.size)
+
 class Database:
     def __init__(self, db_path: str = Config.DB_PATH):
         self.db_path = db_path
+        self._pool = _ConnectionPool(db_path)
+        # session_token -> (user_id, time.monotonic() deadline), least recently used first
+        self._session_cache: "OrderedDict[str, Tuple[int, float]]" = OrderedDict()
+        self._session_lock = threading.Lock()
+        self._next_session_cleanup = 0.0
         self._init_db()
     
+    def get_conn(self):
+        """Borrow a pooled connection for the duration of a with block"""
+        return self._pool.connection()
+    
+    def close(self):
+        """Close all pooled connections"""
+        self._pool.close()
+    
     def _init_db(self):
         """Initialize database tables"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.get_conn() as conn:
             cursor = conn.cursor()
             
             # Users table
@@ -65,12 +162,23 @@ class Database:
                 )
             """)
             
+            # Indexes for the per-user claim listing and its agent results join;
+            # sessions.session_token is already indexed by its UNIQUE constraint
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_claims_user_created
+                ON claims (user_id, created_at DESC)
+            """)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_agent_results_claim
+                ON agent_results (claim_id)
+            """)
+            
             conn.commit()
     
     def create_user(self, username: str, password_hash: str) -> Optional[int]:
         """Create a new user"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.get_conn() as conn:
                 cursor = conn.cursor()
                 cursor.execute(
                     "INSERT INTO users (username, password_hash) VALUES (?, ?)",
@@ -82,20 +190,14 @@ class Database:
     
     def get_user(self, username: str) -> Optional[Dict[str, Any]]:
         """Get user by username"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.get_conn() as conn:
             cursor = conn.cursor()
             cursor.execute(
                 "SELECT id, username, password_hash FROM users WHERE username = ?",
                 (username,)
             )
             row = cursor.fetchone()
-            if row:
-                return {
-                    "id": row[0],
-                    "username": row[1],
-                    "password_hash": row[2]
-                }
-            return None
+            return dict(row) if row else None
     
     def create_session(self, user_id: int) -> str:
         """Create a new session for user"""
@@ -103,7 +205,12 @@ class Database:
         session_token = secrets.token_urlsafe(32)
         expires_at = datetime.now() + timedelta(days=Config.SESSION_EXPIRY_DAYS)
         
-        with sqlite3.connect(self.db_path) as conn:
+        # Sessions are created far less often than validated, so sweeping
+        # here keeps the table to live sessions without a background task
+        if time.monotonic() >= self._next_session_cleanup:
+            self.cleanup_expired_sessions()
+        
+        with self.get_conn() as conn:
             cursor = conn.cursor()
             cursor.execute(
                 "INSERT INTO sessions (user_id, session_token, expires_at) VALUES (?, ?, ?)",
@@ -111,33 +218,63 @@ class Database:
             )
             return session_token
     
+    def cleanup_expired_sessions(self) -> int:
+        """Delete expired sessions, returning how many were removed"""
+        self._next_session_cleanup = time.monotonic() + SESSION_CLEANUP_INTERVAL
+        with self.get_conn() as conn:
+            cursor = conn.execute("DELETE FROM sessions WHERE expires_at <= CURRENT_TIMESTAMP")
+            return cursor.rowcount
+    
     def validate_session(self, session_token: str) -> Optional[int]:
         """Validate session token and return user_id if valid"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._session_lock:
+            cached = self._session_cache.get(session_token)
+            if cached is not None:
+                user_id, deadline = cached
+                if time.monotonic() < deadline:
+                    self._session_cache.move_to_end(session_token)
+                    return user_id
+                del self._session_cache[session_token]
+        
+        with self.get_conn() as conn:
             cursor = conn.cursor()
+            # Seconds left are computed by SQLite, so the cache expires the
+            # token by the same clock as this query
             cursor.execute(
                 """
-                SELECT user_id FROM sessions 
+                SELECT user_id, (julianday(expires_at) - julianday('now')) * 86400
+                FROM sessions 
                 WHERE session_token = ? AND expires_at > CURRENT_TIMESTAMP
                 """,
                 (session_token,)
             )
             row = cursor.fetchone()
-            return row[0] if row else None
+        if not row:
+            return None
+        
+        user_id, remaining = row
+        with self._session_lock:
+            self._session_cache[session_token] = (user_id, time.monotonic() + remaining)
+            if len(self._session_cache) > SESSION_CACHE_SIZE:
+                self._session_cache.popitem(last=False)
+        return user_id
+    
+    def delete_session(self, session_token: str):
+        """End a session, e.g. on logout"""
+        with self._session_lock:
+            self._session_cache.pop(session_token, None)
+        with self.get_conn() as conn:
+            conn.execute("DELETE FROM sessions WHERE session_token = ?", (session_token,))
     
     def save_claim(self, user_id: int, claim_data: Dict[str, Any]) -> int:
         """Save a new claim and its analysis results"""
-        with sqlite3.connect(self.db_path) as conn:
+        # One transaction for the claim and all its agent results
+        with self.get_conn() as conn:
             cursor = conn.cursor()
             
             # Insert claim
             cursor.execute(
-                """
-                INSERT INTO claims (
-                    user_id, claim_text, subject, predicate, object,
-                    status, confidence, explanation
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                """,
+                INSERT_CLAIM_SQL,
                 (
                     user_id,
                     claim_data["claim_text"],
@@ -152,36 +289,34 @@ class Database:
             claim_id = cursor.lastrowid
             
             # Insert agent results
-            for agent_result in claim_data.get("agent_results", []):
-                cursor.execute(
-                    """
-                    INSERT INTO agent_results (
-                        claim_id, agent_name, confidence, explanation
-                    ) VALUES (?, ?, ?, ?)
-                    """,
+            cursor.executemany(
+                INSERT_AGENT_RESULT_SQL,
+                [
                     (
                         claim_id,
                         agent_result["agent_name"],
                         agent_result["confidence"],
                         agent_result["explanation"]
                     )
-                )
+                    for agent_result in claim_data.get("agent_results", [])
+                ]
+            )
             
             return claim_id
     
     def get_user_claims(self, user_id: int) -> List[Dict[str, Any]]:
         """Get all claims for a user"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.get_conn() as conn:
             cursor = conn.cursor()
             cursor.execute(
                 """
-                SELECT c.*, GROUP_CONCAT(
+                SELECT c.*, json_group_array(
                     json_object(
                         'agent_name', ar.agent_name,
                         'confidence', ar.confidence,
                         'explanation', ar.explanation
                     )
-                ) as agent_results
+                ) FILTER (WHERE ar.id IS NOT NULL) as agent_results
                 FROM claims c
                 LEFT JOIN agent_results ar ON c.id = ar.claim_id
                 WHERE c.user_id = ?
@@ -191,21 +326,11 @@ class Database:
                 (user_id,)
             )
             
+            # agent_results arrives as a complete JSON array, "[]" when there are none
             claims = []
             for row in cursor.fetchall():
-                claim = {
-                    "id": row[0],
-                    "user_id": row[1],
-                    "claim_text": row[2],
-                    "subject": row[3],
-                    "predicate": row[4],
-                    "object": row[5],
-                    "status": row[6],
-                    "confidence": row[7],
-                    "explanation": row[8],
-                    "created_at": row[9],
-                    "agent_results": json.loads(f"[{row[10]}]") if row[10] else []
-                }
+                claim = dict(row)
+                claim["agent_results"] = json.loads(claim["agent_results"])
                 claims.append(claim)
             
             return claims 
\ No newline at end of file
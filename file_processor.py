@@ -4,6 +4,31 @@ from typing import List, Dict, Any
 import re
 from config import Config
 
+# PDFium extracts text in native code, far faster than PyPDF2's pure-Python
+# extractor; PyPDF2 is used when pypdfium2 is not installed
+try:
+    import pypdfium2 as pdfium
+except ImportError:
+    pdfium = None
+
+# Linking verbs used to split a sentence into subject / predicate / object
+_CLAIM_VERB_PATTERN = re.compile(
+    r'(?:^|\s)(is|are|was|were|has|have|had)(?=\s|$)',
+    re.IGNORECASE
+)
+
+# Verbs that mark a lowercased sentence as a potential claim
+_CLAIM_PATTERN = re.compile(
+    r'\b(?:is|are|was|were|has|have|had|can|could|will|would|should|proves?|shows?|demonstrates?)\b'
+)
+
+# Phrases that cite supporting evidence, matched as whole words in a lowercased sentence.
+# Patterns are matched against sentence.lower() rather than with re.IGNORECASE,
+# which is markedly slower for plain-word alternations
+_EVIDENCE_PATTERN = re.compile(
+    r'\b(?:' + '|'.join(map(re.escape, ['because', 'since', 'due to', 'as shown by', 'according to'])) + r')\b'
+)
+
 # Download required NLTK data
 try:
     nltk.data.find('tokenizers/punkt')
@@ -18,18 +43,47 @@ class FileProcessor:
             'opinion': ['think', 'believe', 'feel', 'consider', 'view'],
             'evidence': ['prove', 'show', 'demonstrate', 'verify', 'confirm']
         }
+        # Every keyword in one alternation, matched as a whole word in a lowercased
+        # sentence, so 'state' no longer matches "statement" or 'real' "really"
+        self._keyword_pattern = re.compile(
+            r'\b(?:' + '|'.join(
+                re.escape(keyword)
+                for keywords in self.claim_keywords.values()
+                for keyword in keywords
+            ) + r')\b'
+        )
     
     def extract_text_from_pdf(self, file_content: bytes) -> str:
         """Extract text from PDF file"""
+        if pdfium is not None:
+            return self._extract_text_with_pdfium(file_content)
         try:
             pdf_reader = PyPDF2.PdfReader(file_content)
-            text = ""
-            for page in pdf_reader.pages:
-                text += page.extract_text() + "\n"
-            return text
+            # One join instead of re-copying the text so far for every page
+            return "".join(f"{page.extract_text()}\n" for page in pdf_reader.pages)
         except Exception as e:
             raise ValueError(f"Error processing PDF: {str(e)}")
     
+    def _extract_text_with_pdfium(self, file_content: bytes) -> str:
+        """Extract text from PDF file with PDFium"""
+        try:
+            pdf = pdfium.PdfDocument(file_content)
+        except Exception as e:
+            raise ValueError(f"Error processing PDF: {str(e)}")
+        try:
+            parts = []
+            for page in pdf:
+                textpage = page.get_textpage()
+                # PDFium ends lines with CRLF; match PyPDF2's newlines
+                parts.append(textpage.get_text_range().replace("\r\n", "\n") + "\n")
+                textpage.close()
+                page.close()
+            return "".join(parts)
+        except Exception as e:
+            raise ValueError(f"Error processing PDF: {str(e)}")
+        finally:
+            pdf.close()
+    
     def extract_text_from_txt(self, file_content: bytes) -> str:
         """Extract text from TXT file"""
         try:
@@ -47,85 +101,64 @@ class FileProcessor:
         claims = []
         
         for sentence in sentences:
-            # Skip very short sentences
-            if len(sentence.split()) < 3:
+            # Skip very short sentences; splitting stops after the third word
+            if len(sentence.split(None, 2)) < 3:
                 continue
             
+            # Lowercase and scan for keywords once, for both the filter and the score
+            sentence_lower = sentence.lower()
+            has_keyword = self._keyword_pattern.search(sentence_lower) is not None
+            
             # Check if sentence contains claim-related keywords
-            if self._is_potential_claim(sentence):
+            if self._is_potential_claim(sentence_lower, has_keyword):
                 # Extract subject, predicate, and object
                 subject, predicate, object_text = self._extract_claim_components(sentence)
                 
                 if subject and predicate and object_text:
+                    word_count = len(sentence.split())
                     claims.append({
                         "claim_text": sentence.strip(),
                         "subject": subject.strip(),
                         "predicate": predicate.strip(),
                         "object": object_text.strip(),
-                        "confidence": self._calculate_claim_confidence(sentence)
+                        "confidence": self._calculate_claim_confidence(sentence_lower, word_count, has_keyword)
                     })
         
         return claims
     
-    def _is_potential_claim(self, sentence: str) -> bool:
-        """Check if a sentence is likely to contain a claim"""
-        sentence_lower = sentence.lower()
-        
-        # Check for claim-related keywords
-        for category, keywords in self.claim_keywords.items():
-            if any(keyword in sentence_lower for keyword in keywords):
-                return True
-        
-        # Check for common claim patterns
-        claim_patterns = [
-            r'\b(is|are|was|were)\b',
-            r'\b(has|have|had)\b',
-            r'\b(can|could|will|would|should)\b',
-            r'\b(proves?|shows?|demonstrates?)\b'
-        ]
-        
-        return any(re.search(pattern, sentence_lower) for pattern in claim_patterns)
+    def _is_potential_claim(self, sentence_lower: str, has_keyword: bool) -> bool:
+        """Check if a lowercased sentence is likely to contain a claim"""
+        # Claim-related keywords were already checked; fall back to common claim verbs
+        return has_keyword or _CLAIM_PATTERN.search(sentence_lower) is not None
     
     def _extract_claim_components(self, sentence: str) -> tuple:
         """Extract subject, predicate, and object from a sentence"""
         # Basic pattern matching for now - could be improved with more sophisticated NLP
-        words = sentence.split()
-        
-        # Find the main verb (predicate)
-        verb_index = -1
-        for i, word in enumerate(words):
-            if word.lower() in ['is', 'are', 'was', 'were', 'has', 'have', 'had']:
-                verb_index = i
-                break
-        
-        if verb_index == -1:
+        # Find the main verb (predicate): the first whitespace-delimited linking verb
+        match = _CLAIM_VERB_PATTERN.search(sentence)
+        if match is None:
             return None, None, None
         
-        subject = ' '.join(words[:verb_index])
-        predicate = words[verb_index]
-        object_text = ' '.join(words[verb_index + 1:])
+        subject = sentence[:match.start(1)]
+        predicate = match.group(1)
+        object_text = sentence[match.end(1):]
         
         return subject, predicate, object_text
     
-    def _calculate_claim_confidence(self, sentence: str) -> float:
+    def _calculate_claim_confidence(self, sentence_lower: str, word_count: int, has_keyword: bool) -> float:
         """Calculate initial confidence score for a potential claim"""
         confidence = 0.5  # Base confidence
         
         # Adjust confidence based on sentence length
-        words = sentence.split()
-        if 5 <= len(words) <= 20:
+        if 5 <= word_count <= 20:
             confidence += 0.1
         
         # Adjust confidence based on presence of claim keywords
-        sentence_lower = sentence.lower()
-        for category, keywords in self.claim_keywords.items():
-            if any(keyword in sentence_lower for keyword in keywords):
-                confidence += 0.1
-                break
+        if has_keyword:
+            confidence += 0.1
         
         # Adjust confidence based on presence of evidence indicators
-        evidence_indicators = ['because', 'since', 'due to', 'as shown by', 'according to']
-        if any(indicator in sentence_lower for indicator in evidence_indicators):
+        if _EVIDENCE_PATTERN.search(sentence_lower):
             confidence += 0.1
         
         return min(confidence, 1.0)  # Cap at 1.0
@@ -1,6 +1,7 @@
 import os
 import sys
 import logging
+import functools
 import google.generativeai as genai
 from dotenv import load_dotenv
 import os.path
@@ -42,18 +43,26 @@ def load_input(input_path=INPUT_FILE):
         logger.error(f"Error reading input file: {str(e)}")
         return ""
 
+DEFAULT_ASK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ask_files", "clarity.ask")
+
+@functools.lru_cache(maxsize=8)
+def _load_prompt_prefix(path):
+    """Read a prompt template from disk and build the prompt up to the input,
+    caching it for the life of the process."""
+    with open(path, "r", encoding='utf-8') as file:
+        return f"{file.read()}\n\nINPUT:\n"
+
 def run_clarity_agent(text, model, ask_path=None):
     """Run the clarity agent to extract claims from text using the provided model."""
     if ask_path is None:
-        ask_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ask_files", "clarity.ask")
+        ask_path = DEFAULT_ASK_PATH
     try:
-        with open(ask_path, "r", encoding='utf-8') as file:
-            prompt_template = file.read()
+        prompt_prefix = _load_prompt_prefix(ask_path)
     except FileNotFoundError:
         raise FileNotFoundError(f"Prompt template not found at {ask_path}")
     except Exception as e:
         raise Exception(f"Error reading prompt template: {str(e)}")
-    full_prompt = f"{prompt_template}\n\nINPUT:\n{text.strip()}"
+    full_prompt = prompt_prefix + text.strip()
     try:
         response = model.generate_content(full_prompt)
         return response.text.strip()
@@ -1,8 +1,11 @@
 import os
 import json
+import time
+import hashlib
 import logging
 import asyncio
-from typing import Dict, List, Optional, Union, Tuple
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Union, Tuple
 from datetime import datetime
 from pathlib import Path
 from enum import Enum
@@ -11,6 +14,7 @@ from dotenv import load_dotenv
 
 # Import agents
 from agents.agent_clarity import run_clarity_agent
+from agents.gemini import configure_from_env
 from agents.media_scan_agent import MediaScanAgent
 from agents.contextnet_agent import ContextNetAgent
 
@@ -39,6 +43,22 @@ class AnalysisWeight:
     media: float = 0.3
     context: float = 0.3
 
+# Clarity results reused for repeated text, per orchestrator
+CLARITY_CACHE_SIZE = 1024
+CLARITY_CACHE_TTL = 3600  # Seconds before a cached result is re-requested
+
+# Claim components checked for specificity, with their weights
+_SPECIFICITY_FIELDS = ("subject", "predicate", "object", "quantifier")
+_SPECIFICITY_WEIGHTS = (0.3, 0.3, 0.3, 0.1)
+
+def _claim_specificity(claim: Dict) -> Optional[float]:
+    """Score how specific a claim is from which components are present."""
+    try:
+        values = tuple(map(claim.get, _SPECIFICITY_FIELDS))
+    except AttributeError:
+        return None  # Not a claim dict
+    return sum(weight for value, weight in zip(values, _SPECIFICITY_WEIGHTS) if value)
+
 class RealityPatchOrchestrator:
     """Main orchestrator for coordinating RealityPatch agents."""
     
@@ -47,10 +67,12 @@ class RealityPatchOrchestrator:
         self.media_agent = MediaScanAgent()
         self.context_agent = ContextNetAgent()
         self.weights = AnalysisWeight()
+        # Text hash -> (expiry, clarity result, confidence), least recently used first
+        self._clarity_cache: "OrderedDict[str, Tuple[float, Any, float]]" = OrderedDict()
         
-        # Configure Gemini for clarity agent
+        # Configure Gemini for clarity agent, once; the agent reuses a shared model
         self.gemini_api_key = os.getenv("GEMINI_API_KEY")
-        if not self.gemini_api_key:
+        if not configure_from_env():
             logger.warning("GEMINI_API_KEY not found. Clarity analysis will be limited.")
     
     async def analyze(self, 
@@ -148,16 +170,24 @@ class RealityPatchOrchestrator:
                     }
                 }
             
-            # Initialize Gemini model
-            import google.generativeai as genai
-            genai.configure(api_key=self.gemini_api_key)
-            model = genai.GenerativeModel('models/gemini-1.5-flash-latest')
-            
-            # Run clarity analysis
-            result = await run_clarity_agent(text, model)
-            
-            # Calculate confidence based on claim structure and clarity
-            confidence = self._calculate_clarity_confidence(result)
+            key = hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+            cached = self._clarity_cache.get(key)
+            if cached is not None and cached[0] > time.monotonic():
+                self._clarity_cache.move_to_end(key)
+                _, result, confidence = cached
+            else:
+                # Run clarity analysis; the agent awaits Gemini's async API, so this
+                # overlaps with the media and context analyses gathered in analyze()
+                result = await run_clarity_agent(text)
+                
+                # Calculate confidence based on claim structure and clarity
+                confidence = self._calculate_clarity_confidence(result)
+                
+                if not self._is_failed_clarity(result):
+                    self._clarity_cache[key] = (time.monotonic() + CLARITY_CACHE_TTL, result, confidence)
+                    self._clarity_cache.move_to_end(key)
+                    if len(self._clarity_cache) > CLARITY_CACHE_SIZE:
+                        self._clarity_cache.popitem(last=False)
             
             return {
                 "clarity": {
@@ -177,6 +207,16 @@ class RealityPatchOrchestrator:
                 }
             }
     
+    @staticmethod
+    def _is_failed_clarity(result) -> bool:
+        """Check for the agent's fallback result, which is never cached."""
+        if not isinstance(result, dict):
+            return not result
+        return any(
+            isinstance(component, dict) and component.get("type") == "error"
+            for component in result.get("components", [])
+        )
+    
     def _calculate_clarity_confidence(self, claims: List[Dict]) -> float:
         """Calculate confidence score for clarity analysis."""
         if not claims:
@@ -190,22 +230,9 @@ class RealityPatchOrchestrator:
         base_confidence = min(len(claims) * 0.2, 0.8)  # Cap at 0.8
         
         # Adjust for claim specificity and structure
-        specificity_scores = []
-        for claim in claims:
-            # Check for specific elements in claim
-            has_subject = bool(claim.get("subject"))
-            has_predicate = bool(claim.get("predicate"))
-            has_object = bool(claim.get("object"))
-            has_quantifier = bool(claim.get("quantifier"))
-            
-            # Calculate specificity score
-            specificity = sum([
-                has_subject * 0.3,
-                has_predicate * 0.3,
-                has_object * 0.3,
-                has_quantifier * 0.1
-            ])
-            specificity_scores.append(specificity)
+        specificity_scores = [score for score in map(_claim_specificity, claims) if score is not None]
+        if not specificity_scores:
+            return base_confidence
         
         # Average specificity adjustment
         specificity_adjustment = sum(specificity_scores) / len(specificity_scores)
@@ -253,27 +280,36 @@ class RealityPatchOrchestrator:
         verdicts = []
         weighted_scores = []
         conflicts = []
+        clarity = result["clarity_analysis"]
+        media = result["media_analysis"]
+        context = result["context_analysis"]
+        # Conflict flags, recorded as the verdicts are built
+        has_verifiable_claims = False
+        has_manipulated_media = False
         
         # Process clarity analysis
-        if result["clarity_analysis"] and result["clarity_analysis"].get("status") == "success":
-            clarity_confidence = result["clarity_analysis"].get("confidence", 0.0)
+        if clarity and clarity.get("status") == "success":
+            clarity_confidence = clarity.get("confidence", 0.0)
             weighted_scores.append(clarity_confidence * self.weights.clarity)
             if clarity_confidence > 0.6:
                 verdicts.append("Has verifiable claims")
+                has_verifiable_claims = True
         
         # Process media analysis
-        if result["media_analysis"] and result["media_analysis"].get("status") == "success":
-            media_confidence = result["media_analysis"].get("confidence_score", 0.0)
+        if media and media.get("status") == "success":
+            media_confidence = media.get("confidence_score", 0.0)
             weighted_scores.append(media_confidence * self.weights.media)
-            if "verdict" in result["media_analysis"]:
-                verdicts.append(f"Media: {result['media_analysis']['verdict']}")
+            if "verdict" in media:
+                media_verdict = f"Media: {media['verdict']}"
+                verdicts.append(media_verdict)
+                has_manipulated_media = media_verdict.startswith("Media: Manipulated")
         
         # Process context analysis
-        if result["context_analysis"] and result["context_analysis"].get("status") == "success":
-            context_confidence = result["context_analysis"].get("confidence_bias", 0.0)
+        if context and context.get("status") == "success":
+            context_confidence = context.get("confidence_bias", 0.0)
             weighted_scores.append(context_confidence * self.weights.context)
-            if "bias" in result["context_analysis"]:
-                verdicts.append(f"Bias: {result['context_analysis']['bias']}")
+            if "bias" in context:
+                verdicts.append(f"Bias: {context['bias']}")
         
         # Calculate overall confidence
         overall_confidence = sum(weighted_scores) if weighted_scores else 0.0
@@ -291,9 +327,8 @@ class RealityPatchOrchestrator:
             verdict_level = VerdictLevel.INSUFFICIENT_DATA
         
         # Check for conflicts
-        if len(verdicts) > 1:
-            if any("Media: Manipulated" in v for v in verdicts) and any("Has verifiable claims" in v for v in verdicts):
-                conflicts.append("Conflicting evidence between media authenticity and claim verifiability")
+        if has_manipulated_media and has_verifiable_claims:
+            conflicts.append("Conflicting evidence between media authenticity and claim verifiability")
         
         return {
             "overall_verdict": " | ".join(verdicts) if verdicts else "Insufficient data",
@@ -315,4 +350,11 @@ async def main():
     print(json.dumps(result, indent=2))
 
 if __name__ == "__main__":
+    # Use uvloop's faster event loop when it is installed
+    try:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ImportError:
+        pass
+    
     asyncio.run(main()) 
\ No newline at end of file
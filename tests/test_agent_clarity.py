@@ -0,0 +1,57 @@
+import asyncio
+
+from agents import agent_clarity
+from agents.rate_limit import gemini_limiter, GEMINI_MAX_CONCURRENCY
+
+
+class _Chunk:
+    def __init__(self, text):
+        self.text = text
+
+
+class _StreamingModel:
+    """Fake Gemini model streaming a fixed response in small chunks."""
+
+    def __init__(self, text, chunk_size=7):
+        self.chunks = [text[i:i + chunk_size] for i in range(0, len(text), chunk_size)]
+        self.held_during_stream = []
+
+    async def generate_content_async(self, prompt, stream=False):
+        assert stream
+        return self._stream()
+
+    async def _stream(self):
+        for text in self.chunks:
+            self.held_during_stream.append(gemini_limiter._sem._value < GEMINI_MAX_CONCURRENCY)
+            yield _Chunk(text)
+
+
+def _collect(claims):
+    async def run():
+        return [analysis async for analysis in agent_clarity.stream_clarity_agent_batch(claims)]
+    return asyncio.run(run())
+
+
+def test_stream_holds_limiter_until_consumed(monkeypatch):
+    model = _StreamingModel('```json\n[{"clarity_score": 0.9, "components": []}, '
+                            '{"clarity_score": 0.4, "components": []}]\n```')
+    monkeypatch.setattr(agent_clarity, "get_model", lambda: model)
+
+    results = _collect(["Claim one", "Claim two"])
+
+    assert [r["clarity_score"] for r in results] == [0.9, 0.4]
+    assert model.held_during_stream and all(model.held_during_stream)
+    assert gemini_limiter._sem._value == GEMINI_MAX_CONCURRENCY
+    assert not gemini_limiter._held
+
+
+def test_truncated_stream_falls_back_and_releases_limiter(monkeypatch):
+    model = _StreamingModel('[{"clarity_score": 0.9, "components": []}, {"clarity_')
+    monkeypatch.setattr(agent_clarity, "get_model", lambda: model)
+
+    results = _collect(["Claim one", "Claim two"])
+
+    assert results[0]["clarity_score"] == 0.9
+    assert results[1]["components"][0]["type"] == "error"
+    assert gemini_limiter._sem._value == GEMINI_MAX_CONCURRENCY
+    assert not gemini_limiter._held
@@ -0,0 +1,53 @@
+from collections import OrderedDict
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("streamlit")
+pytest.importorskip("pandas")
+
+import app
+from agents.agent_proof import _heuristic_verdict, _unverified_result
+
+
+@pytest.fixture
+def session(monkeypatch):
+    state = SimpleNamespace(claim_cache=OrderedDict())
+    monkeypatch.setattr(app.st, "session_state", state)
+    return state
+
+
+def _clarity_result():
+    return {"clarity_score": 0.8, "components": [{"type": "subject", "text": "Vaccines"}]}
+
+
+def test_genuine_unverified_verdict_is_cached(session):
+    result = _heuristic_verdict("Vaccines cause autism")
+    assert result["verdict"] == "UNVERIFIED"
+
+    app.cache_result("proof", "Vaccines cause autism", result)
+
+    assert app.get_cached_result("proof", "vaccines cause autism ") is result
+
+
+def test_fallback_result_is_not_cached(session):
+    result = _unverified_result("Error parsing response", "2024-01-01T00:00:00")
+
+    app.cache_result("proof", "Some claim", result)
+
+    assert app.get_cached_result("proof", "Some claim") is None
+
+
+def test_unverified_analysis_is_complete():
+    results = {"clarity": _clarity_result(), "proof": _heuristic_verdict("Vaccines cause autism")}
+
+    assert app._analysis_complete(results)
+
+
+def test_analysis_with_fallback_proof_is_incomplete():
+    results = {
+        "clarity": _clarity_result(),
+        "proof": _unverified_result("Missing verdict in batch response", "2024-01-01T00:00:00")
+    }
+
+    assert not app._analysis_complete(results)